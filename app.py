@@ -4,7 +4,16 @@ Flask Web应用主文件
 
 import os
 import logging
-from flask import Flask, render_template, jsonify, request
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from decimal import Decimal
+from enum import Enum
+from flask import Flask, Response, render_template, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import RequestEntityTooLarge
+import orjson
 import yaml
 
 from src.threadpool_manager import ThreadPoolManager
@@ -21,24 +30,173 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    基于orjson的JSON序列化实现，替代Flask默认的标准库json
+    """
+
+    @staticmethod
+    def default(obj):
+        """处理orjson无法原生序列化的类型"""
+        if isinstance(obj, Enum):
+            return obj.value
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return DefaultJSONProvider.default(obj)
+
+    def _option(self, sort_keys: bool = None) -> int:
+        """根据调试模式和sort_keys设置选择orjson序列化选项"""
+        option = orjson.OPT_NON_STR_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        """序列化为JSON字符串，支持sort_keys参数，其余标准库json参数被忽略"""
+        option = self._option(kwargs.get('sort_keys'))
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """反序列化JSON，orjson可直接处理str和bytes"""
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """直接使用orjson输出的bytes构建响应，避免额外的编码转换"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._option()),
+            mimetype=self.mimetype
+        )
+
+
 # 创建Flask应用
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # 加载配置
-def load_config():
-    """加载配置文件"""
-    config_path = 'custom-conf.yml'
-    if os.path.exists(config_path):
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    return {}
+# 优先使用libyaml的C扩展解析器
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def load_config(config_path: str = 'custom-conf.yml'):
+    """
+    加载配置文件
+
+    解析结果以JSON形式缓存在配置文件旁的固定文件中，缓存内记录配置文件的mtime，
+    配置未修改时后续启动直接读取缓存，跳过YAML解析。
+    无法无损转换为JSON的配置（如非字符串键、日期）不缓存，保证冷启动和热启动结果一致。
+
+    Args:
+        config_path: 配置文件路径
+
+    Returns:
+        dict: 配置字典
+    """
+    if not os.path.exists(config_path):
+        return {}
+
+    mtime = os.stat(config_path).st_mtime_ns
+    cache_path = f"{config_path}.cache.json"
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = orjson.loads(f.read())
+        if cached.get('mtime') == mtime:
+            return cached['config']
+    except FileNotFoundError:
+        pass
+    except (OSError, orjson.JSONDecodeError, AttributeError, KeyError) as e:
+        logger.warning("Ignoring invalid config cache %s: %s", cache_path, e)
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=_YAML_LOADER) or {}
+
+    # 无法无损缓存的配置需删除旧缓存，避免下次启动读到过期内容
+    try:
+        body = orjson.dumps({'mtime': mtime, 'config': config})
+        if orjson.loads(body)['config'] != config:
+            raise TypeError("config is not losslessly representable as JSON")
+    except TypeError as e:
+        logger.warning("Not caching config %s: %s", config_path, e)
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return config
+
+    # 经由唯一的临时文件原子替换缓存，多个进程同时启动时互不干扰；写入失败不影响启动
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or '.',
+                                        prefix=f"{os.path.basename(cache_path)}.",
+                                        suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Failed to write config cache %s: %s", cache_path, e)
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return config
 
 config = load_config()
 app.config.update(config.get('flask', {}))
+# 限制请求体大小，超限的请求在解析JSON前即被拒绝
+if app.config.get('MAX_CONTENT_LENGTH') is None:
+    app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024
 
 # 创建线程池管理器实例
 pool_manager = ThreadPoolManager()
 
+# 预先序列化的固定响应体，返回时无需再做JSON序列化
+# 与jsonify默认的sort_keys行为一致，按键排序
+_SUCCESS_BODY = orjson.dumps({'success': True}, option=orjson.OPT_SORT_KEYS)
+_FAILURE_BODY = orjson.dumps({'success': False}, option=orjson.OPT_SORT_KEYS)
+_NOT_FOUND_BODY = orjson.dumps({'success': False, 'error': 'Not found'}, option=orjson.OPT_SORT_KEYS)
+_INTERNAL_ERROR_BODY = orjson.dumps({'success': False, 'error': 'Internal server error'},
+                                    option=orjson.OPT_SORT_KEYS)
+_TOO_LARGE_BODY = orjson.dumps({'success': False, 'error': 'Request body too large'},
+                               option=orjson.OPT_SORT_KEYS)
+
+
+def _raw_json(body: bytes, status: int = 200):
+    """使用已序列化的JSON响应体构建响应"""
+    return app.response_class(body, status=status, mimetype='application/json')
+
+
+def _success_response(success: bool = True):
+    """返回只包含success字段的响应"""
+    return _raw_json(_SUCCESS_BODY if success else _FAILURE_BODY)
+
+def _not_modified(etag: str):
+    """返回304响应，客户端缓存的数据仍然有效"""
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+# 后台执行耗时的管理操作（如等待线程池任务排空），避免阻塞请求线程
+_ADMIN_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='admin')
+# 正在后台关闭的线程池: pool_id -> Future
+_closing_pools = {}
+# 最近结束的后台关闭结果: pool_id -> 'closed' | 'failed'，只保留最近的若干条
+_close_results = OrderedDict()
+_CLOSE_RESULTS_LIMIT = 1024
+_closing_pools_lock = threading.Lock()
+
+# 应用退出时通知演示任务立即结束，释放工作线程
+_DEMO_STOP = threading.Event()
+
+
+def demo_task(duration=5):
+    """演示任务：等待指定秒数后完成，应用退出时提前结束"""
+    _DEMO_STOP.wait(duration)
+    return f"Task completed after {duration} seconds"
+
 # 根路由
 @app.route('/')
 def index():
@@ -48,12 +206,19 @@ def index():
 # API路由 - 线程池管理
 @app.route('/api/pools', methods=['GET'])
 def list_pools():
-    """获取线程池列表"""
+    """获取线程池列表（支持ETag条件请求）"""
     try:
-        pools = pool_manager.list_pools()
-        return jsonify({'success': True, 'data': pools})
+        version = pool_manager.get_version()
+        if request.if_none_match.contains(version):
+            return _not_modified(version)
+        
+        # 线程池信息已由各线程池序列化，直接拼接响应体（线程池对象内的字段不排序）
+        body = b'{"data":' + pool_manager.list_pools_bytes() + b',"success":true}'
+        response = _raw_json(body)
+        response.set_etag(version)
+        return response
     except Exception as e:
-        logger.error(f"Error listing pools: {e}")
+        logger.error("Error listing pools: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/pools', methods=['POST'])
@@ -70,8 +235,11 @@ def create_pool():
         return jsonify({'success': True, 'data': pool_info})
     except PoolAlreadyExistsError as e:
         return jsonify({'success': False, 'error': str(e)}), 400
+    except RequestEntityTooLarge:
+        # 交给413错误处理器
+        raise
     except Exception as e:
-        logger.error(f"Error creating pool: {e}")
+        logger.error("Error creating pool: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 # 停止线程池未执行future
 @app.route('/api/pools/<pool_id>/cancel_pool_tasks', methods=['POST'])
@@ -79,32 +247,85 @@ def cancel_pool_tasks(pool_id):
     """停止线程池未执行future"""
     try:
         success = pool_manager.cancel_pool_tasks(pool_id)
-        return jsonify({'success': success})
+        return _success_response(success)
     except PoolNotFoundError as e:
         return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
-        logger.error(f"Error canceling tasks in pool {pool_id}: {e}")
+        logger.error("Error canceling tasks in pool %s: %s", pool_id, e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
     
 
 
+def _on_pool_closed(pool_id: str, future: Future):
+    """后台关闭结束后记录结果，并移出正在关闭的线程池表"""
+    status = 'closed' if future.exception() is None and future.result() else 'failed'
+    with _closing_pools_lock:
+        if _closing_pools.get(pool_id) is not future:
+            return
+        del _closing_pools[pool_id]
+        _close_results[pool_id] = status
+        _close_results.move_to_end(pool_id)
+        while len(_close_results) > _CLOSE_RESULTS_LIMIT:
+            _close_results.popitem(last=False)
+
 @app.route('/api/pools/<pool_id>', methods=['DELETE'])
 def close_pool(pool_id):
-    """关闭线程池"""
+    """关闭线程池（在后台等待任务完成，立即返回202）"""
     try:
-        success = pool_manager.close_pool(pool_id, wait=True)
-        return jsonify({'success': success})
+        future = None
+        with _closing_pools_lock:
+            if pool_id not in _closing_pools:
+                # 已关闭的线程池不再存在于管理器中，返回404；关闭失败的线程池可以重新关闭
+                pool_manager.get_pool(pool_id)
+                _close_results.pop(pool_id, None)
+                future = _ADMIN_EXECUTOR.submit(pool_manager.close_pool, pool_id, True)
+                _closing_pools[pool_id] = future
+        if future is not None:
+            # 在锁外注册回调：future已完成时回调会立即在当前线程执行
+            future.add_done_callback(lambda f: _on_pool_closed(pool_id, f))
+        return jsonify({'success': True, 'status': 'closing'}), 202
     except PoolNotFoundError as e:
         return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
-        logger.error(f"Error closing pool {pool_id}: {e}")
+        logger.error("Error closing pool %s: %s", pool_id, e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/pools/<pool_id>/close-status', methods=['GET'])
+def get_pool_close_status(pool_id):
+    """
+    获取线程池后台关闭的进度
+    
+    返回:
+    {
+        "success": true,
+        "data": {
+            "pool_id": "pool-1",
+            "status": "closing" | "closed" | "failed"
+        }
+    }
+    """
+    with _closing_pools_lock:
+        future = _closing_pools.get(pool_id)
+        status = _close_results.get(pool_id)
+    if future is not None:
+        # 关闭已结束但回调尚未执行时按future的结果返回
+        if not future.done():
+            status = 'closing'
+        elif future.exception() is None and future.result():
+            status = 'closed'
+        else:
+            status = 'failed'
+    if status is None:
+        return jsonify({'success': False, 'error': f'Pool {pool_id} is not being closed'}), 404
+    return jsonify({'success': True, 'data': {'pool_id': pool_id, 'status': status}})
+
 @app.route('/api/pools/<pool_id>/force-close', methods=['DELETE'])
 def force_close_pool(pool_id):
     """强制关闭线程池"""
     try:
+        # 管理器对不存在的线程池静默返回，接口仍对未知线程池返回404
+        pool_manager.get_pool(pool_id)
         cancelled_tasks = pool_manager.force_close_pool(pool_id)
         return jsonify({
             'success': True, 
@@ -113,10 +334,16 @@ def force_close_pool(pool_id):
     except PoolNotFoundError as e:
         return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
-        logger.error(f"Error force closing pool {pool_id}: {e}")
+        logger.error("Error force closing pool %s: %s", pool_id, e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # API路由 - 任务管理
+def _get_pagination_args():
+    """解析请求中的分页参数，返回(page, per_page)，无效值使用默认值"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    return max(1, page), min(100, max(1, per_page))
+
 @app.route('/api/tasks', methods=['GET'])
 def list_tasks():
     """获取任务列表（支持分页）"""
@@ -124,25 +351,24 @@ def list_tasks():
         pool_id = request.args.get('pool_id')
         
         # 分页参数
-        try:
-            page = max(1, int(request.args.get('page', 1)))
-            per_page = max(1, min(100, int(request.args.get('per_page', 10))))
-        except (ValueError, TypeError):
-            page = 1
-            per_page = 10
+        page, per_page = _get_pagination_args()
         
-        # 获取所有任务
-        all_tasks = pool_manager.list_tasks(pool_id=pool_id)
+        # 只获取当前页的任务
+        start_index = (page - 1) * per_page
+        total_items, current_tasks = pool_manager.list_tasks_page(
+            pool_id=pool_id, offset=start_index, limit=per_page
+        )
         
         # 分页计算
-        total_items = len(all_tasks)
-        total_pages = max(1, (total_items + per_page - 1) // per_page)
+        total_pages = max(1, -(-total_items // per_page))
         current_page = max(1, min(page, total_pages))
         
-        # 计算当前页数据
-        start_index = (current_page - 1) * per_page
-        end_index = start_index + per_page
-        current_tasks = all_tasks[start_index:end_index]
+        if current_page != page:
+            # 页码超出范围时返回最后一页
+            start_index = (current_page - 1) * per_page
+            total_items, current_tasks = pool_manager.list_tasks_page(
+                pool_id=pool_id, offset=start_index, limit=per_page
+            )
         
         # 构建分页元数据
         pagination = {
@@ -165,7 +391,32 @@ def list_tasks():
     except PoolNotFoundError as e:
         return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
-        logger.error(f"Error listing tasks: {e}")
+        logger.error("Error listing tasks: %s", e)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/tasks/stream', methods=['GET'])
+def stream_tasks():
+    """以NDJSON格式流式返回任务列表（支持分页），每行一个任务"""
+    try:
+        pool_id = request.args.get('pool_id')
+        page, per_page = _get_pagination_args()
+        
+        _, page_tasks = pool_manager.get_tasks_page(
+            pool_id=pool_id, offset=(page - 1) * per_page, limit=per_page
+        )
+        
+        option = orjson.OPT_SORT_KEYS if app.json.sort_keys else None
+        
+        def generate():
+            for task in page_tasks:
+                yield orjson.dumps(task.get_info(), option=option) + b'\n'
+        
+        return Response(generate(), mimetype='application/x-ndjson')
+        
+    except PoolNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except Exception as e:
+        logger.error("Error streaming tasks: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/tasks', methods=['POST'])
@@ -179,18 +430,13 @@ def submit_task():
         
         # 创建演示任务
         if task_type == 'demo':
-            import time
-            def demo_task(duration=5):
-                time.sleep(duration)
-                return f"Task completed after {duration} seconds"
-            
             # 安全地转换duration参数为整数
             duration_str = data.get('duration', '5')
             try:
                 duration = int(str(duration_str))
             except (ValueError, TypeError):
                 duration = 5
-                logger.warning(f"Invalid duration value: {duration_str}, using default: 5")
+                logger.warning("Invalid duration value: %s, using default: 5", duration_str)
             
             task_id = pool_manager.submit_task(
                 pool_id, demo_task, task_name, duration
@@ -198,12 +444,15 @@ def submit_task():
         else:
             return jsonify({'success': False, 'error': 'Unsupported task type'}), 400
         
-        return jsonify({'success': True})
+        return _success_response()
         
     except PoolNotFoundError as e:
         return jsonify({'success': False, 'error': str(e)}), 404
+    except RequestEntityTooLarge:
+        # 交给413错误处理器
+        raise
     except Exception as e:
-        logger.error(f"Error submitting task: {e}")
+        logger.error("Error submitting task: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/tasks/<task_id>', methods=['DELETE'])
@@ -211,11 +460,11 @@ def cancel_task(task_id):
     """取消任务"""
     try:
         success = pool_manager.cancel_task(task_id)
-        return jsonify({'success': success})
+        return _success_response(success)
     except TaskNotFoundError as e:
         return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
-        logger.error(f"Error cancelling task {task_id}: {e}")
+        logger.error("Error cancelling task %s: %s", task_id, e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/tasks/<task_id>', methods=['GET'])
@@ -227,28 +476,38 @@ def get_task(task_id):
     except TaskNotFoundError as e:
         return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
-        logger.error(f"Error getting task {task_id}: {e}")
+        logger.error("Error getting task %s: %s", task_id, e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # 系统信息
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    """获取系统统计信息"""
+    """获取系统统计信息（支持ETag条件请求）"""
     try:
+        version = pool_manager.get_version()
+        if request.if_none_match.contains(version):
+            return _not_modified(version)
+        
         stats = pool_manager.get_stats()
-        return jsonify({'success': True, 'data': stats})
+        response = jsonify({'success': True, 'data': stats})
+        response.set_etag(version)
+        return response
     except Exception as e:
-        logger.error(f"Error getting stats: {e}")
+        logger.error("Error getting stats: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # 错误处理
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'success': False, 'error': 'Not found'}), 404
+    return _raw_json(_NOT_FOUND_BODY, 404)
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return _raw_json(_TOO_LARGE_BODY, 413)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'success': False, 'error': 'Internal server error'}), 500
+    return _raw_json(_INTERNAL_ERROR_BODY, 500)
 
 
 
@@ -298,8 +557,11 @@ def resize_pool(pool_id):
             'success': False,
             'error': f'参数错误: {str(e)}'
         }), 400
+    except RequestEntityTooLarge:
+        # 交给413错误处理器
+        raise
     except Exception as e:
-        logger.error(f"Error resizing pool {pool_id}: {e}")
+        logger.error("Error resizing pool %s: %s", pool_id, e)
         return jsonify({
             'success': False,
             'error': f'调整线程池大小失败: {str(e)}'
@@ -337,7 +599,7 @@ def get_pool_resize_info(pool_id):
             'error': f'线程池不存在: {str(e)}'
         }), 404
     except Exception as e:
-        logger.error(f"Error getting resize info for pool {pool_id}: {e}")
+        logger.error("Error getting resize info for pool %s: %s", pool_id, e)
         return jsonify({
             'success': False,
             'error': f'获取调整信息失败: {str(e)}'
@@ -350,11 +612,11 @@ with app.app_context():
     # 创建默认线程池
     try:
         default_pool_id = pool_manager.create_pool("default", 5)
-        logger.info(f"Created default pool: {default_pool_id}")
+        logger.info("Created default pool: %s", default_pool_id)
     except PoolAlreadyExistsError:
         logger.warning("Default pool already exists")
     except Exception as e:
-        logger.error(f"Error creating default pool: {e}")
+        logger.error("Error creating default pool: %s", e)
 
 
 
@@ -364,6 +626,8 @@ if __name__ == '__main__':
     def cleanup():
         """应用退出时清理资源"""
         logger.info("正在关闭应用...")
+        _DEMO_STOP.set()
+        _ADMIN_EXECUTOR.shutdown(wait=False)
         pool_manager.shutdown()
     # 运行应用
     host = config.get('flask', {}).get('host', '127.0.0.1')
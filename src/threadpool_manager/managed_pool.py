@@ -2,14 +2,31 @@
 自定义线程池实现
 """
 
-import uuid
+import itertools
 import threading
-from typing import Dict, List, Optional, Any, Callable
-from concurrent.futures import ThreadPoolExecutor, Future
+from collections import Counter, OrderedDict
+from itertools import islice
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+import orjson
 
 from .enums import PoolStatus, TaskStatus
-from .managed_task import ManagedTask
+from .managed_task import ManagedTask, _DONE_STATUSES
 from .exceptions import InvalidPoolStateError
+from .sharded_executor import ShardedExecutor
+
+
+# 常用枚举成员的模块级别名，热点路径上使用身份比较（枚举成员为单例）
+_PENDING = TaskStatus.PENDING
+_RUNNING = TaskStatus.RUNNING
+_COMPLETED = TaskStatus.COMPLETED
+_FAILED = TaskStatus.FAILED
+_CANCELLED = TaskStatus.CANCELLED
+_POOL_RUNNING = PoolStatus.RUNNING
+
+# 线程池状态到字符串值的查找表
+_POOL_STATUS_VALUES = {status: status.value for status in PoolStatus}
 
 
 class ManagedThreadPool:
@@ -17,7 +34,24 @@ class ManagedThreadPool:
     自定义线程池，提供任务管理和状态跟踪功能
     """
     
-    def __init__(self, pool_id: str, name: str, max_workers: int = None):
+    # 默认保留的已完成任务数量上限
+    DEFAULT_MAX_TASK_HISTORY = 10000
+    
+    # 工作线程数在该范围内时使用分片工作窃取执行器。4个提交线程各提交2万个空任务的
+    # 基准测试中，分片执行器在4到16个工作线程时比ThreadPoolExecutor快，32个时不再占优
+    SHARDED_EXECUTOR_MIN_WORKERS = 4
+    SHARDED_EXECUTOR_MAX_WORKERS = 16
+    
+    __slots__ = (
+        'pool_id', 'name', 'max_workers', 'max_task_history', 'executor',
+        '_static_json', 'status', '_running', '_task_counter', 'tasks', '_lock',
+        '_task_status', '_status_counts', '_completed_ids', '_status_lock', '_version',
+        'task_done_listener'
+    )
+    
+    def __init__(self, pool_id: str, name: str, max_workers: int = None,
+                 max_task_history: int = None,
+                 task_done_listener: Optional[Callable[[ManagedTask], None]] = None):
         """
         初始化线程池
         
@@ -25,22 +59,120 @@ class ManagedThreadPool:
             pool_id: 线程池唯一标识
             name: 线程池名称
             max_workers: 最大工作线程数
+            max_task_history: 保留的已完成任务数量上限，超出时淘汰最早完成的任务
+            task_done_listener: 任务进入终态后的回调，参数为完成的任务
         """
         self.pool_id = pool_id
         self.name = name
         self.max_workers = max_workers or 5
-        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.max_task_history = max_task_history or self.DEFAULT_MAX_TASK_HISTORY
+        self.executor = self._create_executor(self.max_workers)
+        self._cache_static_json()
         self.status = PoolStatus.RUNNING
+        # 是否接受新任务；状态只会从运行变为关闭，无锁读取即可快速判断
+        self._running = True
         
-        # 任务管理
+        # 任务ID计数器，任务ID由线程池ID和自增序号组成
+        self._task_counter = itertools.count()
+        
+        # 任务管理；任务表的单键插入、查找和删除在GIL下是原子的，无需加锁，
+        # 且任务表只原地修改、不会被整体替换
         self.tasks: Dict[str, ManagedTask] = {}
-        self._lock = threading.RLock()
+        # 只用于关闭、调整大小等需要同时修改状态和执行器的操作
+        self._lock = threading.Lock()
+        
+        # 任务ID到已计数状态的映射，与任务表平行存储；计数的增减都以这里记录的
+        # 状态为准，不读取可能已被其他线程更新的task.status
+        self._task_status: Dict[str, TaskStatus] = {}
+        # 各状态任务计数，随任务状态变更增量维护
+        self._status_counts = Counter({status: 0 for status in TaskStatus})
+        # 已完成任务ID，按完成顺序排列，用于淘汰最早完成的任务
+        self._completed_ids: OrderedDict = OrderedDict()
+        self._status_lock = threading.Lock()
+        # 版本号，线程池信息（状态、任务计数等）每次变化时在状态锁内递增
+        self._version = 0
+        self.task_done_listener = task_done_listener
+    
+    @classmethod
+    def _create_executor(cls, max_workers: int) -> Executor:
+        """根据工作线程数选择执行器实现"""
+        if cls.SHARDED_EXECUTOR_MIN_WORKERS <= max_workers <= cls.SHARDED_EXECUTOR_MAX_WORKERS:
+            return ShardedExecutor(max_workers=max_workers)
+        return ThreadPoolExecutor(max_workers=max_workers)
+    
+    def _cache_static_json(self):
+        """预先序列化线程池信息中的不变字段（去掉结尾的'}'，便于拼接动态字段）"""
+        self._static_json = orjson.dumps({
+            'pool_id': self.pool_id,
+            'name': self.name,
+            'max_workers': self.max_workers
+        })[:-1]
+    
+    def _on_task_status_change(self, task: ManagedTask, old_status: TaskStatus,
+                               new_status: TaskStatus):
+        """任务状态变更回调，更新状态计数并淘汰超出保留上限的已完成任务"""
+        done = new_status in _DONE_STATUSES
+        task_id = task.task_id
+        with self._status_lock:
+            self._version += 1
+            counted_status = self._task_status.get(task_id)
+            if counted_status is None:
+                # 任务已不再由线程池跟踪（已被清理或淘汰）
+                return
+            self._task_status[task_id] = new_status
+            self._status_counts[counted_status] -= 1
+            self._status_counts[new_status] += 1
+            
+            if done:
+                self._completed_ids[task_id] = None
+                while len(self._completed_ids) > self.max_task_history:
+                    evicted_id, _ = self._completed_ids.popitem(last=False)
+                    self._drop_task(evicted_id)
+        
+        # 在状态锁外通知，监听者可以安全地调用线程池的其他方法
+        if done and self.task_done_listener is not None:
+            self.task_done_listener(task)
+    
+    def _drop_task(self, task_id: str):
+        """从任务表、状态表和状态计数中移除任务（调用方需持有_status_lock）"""
+        self.tasks.pop(task_id, None)
+        # 任务可能已被保留上限淘汰，只对仍被计数的任务减少计数
+        counted_status = self._task_status.pop(task_id, None)
+        if counted_status is not None:
+            self._status_counts[counted_status] -= 1
+    
+    def _untrack_tasks(self, tasks: List[ManagedTask]):
+        """从任务表和状态计数中移除不再由线程池跟踪的任务"""
+        with self._status_lock:
+            for task in tasks:
+                self._drop_task(task.task_id)
+                self._completed_ids.pop(task.task_id, None)
+            self._version += 1
+    
+    def _touch(self):
+        """标记线程池信息已变化"""
+        with self._status_lock:
+            self._version += 1
+    
+    def get_version(self) -> int:
+        """
+        获取线程池信息的版本号
+        
+        Returns:
+            int: 版本号，线程池状态或任务计数变化后递增
+        """
+        return self._version
+    
     def cancel_tasks(self):
         """取消所有未运行任务"""
+        # 持锁期间只收集待执行任务（避免与调整大小时的任务迁移交错），在锁外逐个取消
         with self._lock:
-            for task in self.tasks.values():
-                if not task.is_done() and not task.is_running():
-                    task.cancel()
+            pending_tasks = [
+                task for task in tuple(self.tasks.values()) if task.status is _PENDING
+            ]
+        for task in pending_tasks:
+            task.cancel()
+    
     def submit(self, task_func: Callable, task_name: str = None, 
                *args, **kwargs) -> str:
         """
@@ -48,7 +180,7 @@ class ManagedThreadPool:
         
         Args:
             task_func: 要执行的任务函数
-            task_name: 任务名称，如果为None则使用UUID
+            task_name: 任务名称，如果为None则根据任务ID生成
             *args, **kwargs: 任务函数参数
             
         Returns:
@@ -57,34 +189,138 @@ class ManagedThreadPool:
         Raises:
             InvalidPoolStateError: 如果线程池已关闭
         """
-        with self._lock:
-            if self.status != PoolStatus.RUNNING:
-                raise InvalidPoolStateError(f"Pool {self.pool_id} is not running")
+        return self.submit_task_obj(task_func, task_name, *args, **kwargs).task_id
+    
+    def submit_task_obj(self, task_func: Callable, task_name: str = None,
+                        *args, **kwargs) -> ManagedTask:
+        """
+        提交任务到线程池，直接返回任务对象
+        
+        Args:
+            task_func: 要执行的任务函数
+            task_name: 任务名称，如果为None则根据任务ID生成
+            *args, **kwargs: 任务函数参数
             
-            # 生成任务ID和名称
-            task_id = str(uuid.uuid4())
-            if not task_name:
-                task_name = f"task-{task_id[:8]}"
-             # 创建任务包装器
-            managed_task = ManagedTask(
-                task_id=task_id,
-                name=task_name,
-                pool_id=self.pool_id,
-                task_func=task_func,
-                args=args,
-                kwargs=kwargs
-            )
-            # 存储任务
-            self.tasks[task_id] = managed_task
-
-            # 提交任务到线程池
-            future = self.executor.submit(managed_task.start)
-            # 设置任务的Future对象
-            managed_task.set_future(future)
+        Returns:
+            ManagedTask: 任务对象
+            
+        Raises:
+            InvalidPoolStateError: 如果线程池已关闭
+        """
+        # 无锁快速拒绝已关闭线程池的提交
+        if not self._running:
+            raise InvalidPoolStateError(f"Pool {self.pool_id} is not running")
+        
+        managed_task = self._new_task(task_func, task_name, args, kwargs)
+        task_id = managed_task.task_id
+        
+        # 存储任务
+        self.tasks[task_id] = managed_task
+        with self._status_lock:
+            self._task_status[task_id] = _PENDING
+            self._status_counts[_PENDING] += 1
+            self._version += 1
+        
+        # 提交任务到线程池；若期间线程池被关闭，执行器会拒绝提交并在下面回滚
+        future = self._submit_to_executor(managed_task, self.executor)
+        # 设置任务的Future对象
+        managed_task.set_future(future)
+        
+        return managed_task
+    
+    def submit_many(self, jobs: List[Tuple[Callable, Optional[str], tuple, Optional[dict]]]) -> List[str]:
+        """
+        批量提交任务到线程池
+        
+        Args:
+            jobs: 任务列表，每项为(任务函数, 任务名称, 位置参数元组, 关键字参数字典)
             
-           
+        Returns:
+            List[str]: 按提交顺序排列的任务ID列表
+            
+        Raises:
+            InvalidPoolStateError: 如果线程池已关闭，尚未投递的任务不会被执行
+        """
+        return [managed_task.task_id for managed_task in self.submit_many_obj(jobs)]
+    
+    def submit_many_obj(self, jobs: List[Tuple[Callable, Optional[str], tuple, Optional[dict]]]) -> List[ManagedTask]:
+        """
+        批量提交任务到线程池，直接返回任务对象
+        
+        所有任务一次性登记到任务表和状态计数中，再逐个投递到执行器。
+        
+        Args:
+            jobs: 任务列表，每项为(任务函数, 任务名称, 位置参数元组, 关键字参数字典)
+            
+        Returns:
+            List[ManagedTask]: 按提交顺序排列的任务对象列表
             
-            return task_id,future
+        Raises:
+            InvalidPoolStateError: 如果线程池已关闭，尚未投递的任务不会被执行
+        """
+        if not self._running:
+            raise InvalidPoolStateError(f"Pool {self.pool_id} is not running")
+        
+        managed_tasks = [
+            self._new_task(task_func, task_name, args, kwargs)
+            for task_func, task_name, args, kwargs in jobs
+        ]
+        
+        # 存储任务，只获取一次状态锁
+        tasks = self.tasks
+        with self._status_lock:
+            for managed_task in managed_tasks:
+                tasks[managed_task.task_id] = managed_task
+                self._task_status[managed_task.task_id] = _PENDING
+            self._status_counts[_PENDING] += len(managed_tasks)
+            self._version += 1
+        
+        for index, managed_task in enumerate(managed_tasks):
+            try:
+                future = self._submit_to_executor(managed_task, self.executor)
+            except InvalidPoolStateError:
+                # 线程池已关闭，回滚剩余尚未投递的任务
+                self._untrack_tasks(managed_tasks[index + 1:])
+                raise
+            managed_task.set_future(future)
+        
+        return managed_tasks
+    
+    def _new_task(self, task_func: Callable, task_name: Optional[str],
+                  args: tuple, kwargs: Optional[dict]) -> ManagedTask:
+        """创建任务包装器，生成任务ID和默认名称不涉及共享状态，无需持有锁"""
+        task_number = next(self._task_counter)
+        task_id = f"{self.pool_id}-{task_number}"
+        if not task_name:
+            task_name = f"task-{task_number}"
+        return ManagedTask(
+            task_id=task_id,
+            name=task_name,
+            pool_id=self.pool_id,
+            task_func=task_func,
+            args=args or (),
+            kwargs=kwargs,
+            status_listener=self._on_task_status_change
+        )
+    
+    def _submit_to_executor(self, managed_task: ManagedTask, executor) -> Future:
+        """
+        将任务提交到执行器
+        
+        如果提交期间执行器因调整大小被替换，则重试提交到新的执行器。
+        
+        Raises:
+            InvalidPoolStateError: 如果线程池已关闭
+        """
+        while True:
+            try:
+                return executor.submit(managed_task.start)
+            except RuntimeError:
+                with self._lock:
+                    if not self._running or self.executor is executor:
+                        self._untrack_tasks([managed_task])
+                        raise InvalidPoolStateError(f"Pool {self.pool_id} is not running")
+                    executor = self.executor
     
     def get_task(self, task_id: str) -> Optional[ManagedTask]:
         """
@@ -98,6 +334,11 @@ class ManagedThreadPool:
         """
         return self.tasks.get(task_id)
     
+    @property
+    def task_count(self) -> int:
+        """当前任务表中的任务数量"""
+        return len(self.tasks)
+    
     def list_tasks(self) -> List[Dict[str, Any]]:
         """
         获取所有任务信息
@@ -105,8 +346,42 @@ class ManagedThreadPool:
         Returns:
             List[Dict]: 任务信息列表
         """
-        with self._lock:
-            return [task.get_info() for task in self.tasks.values()]
+        # 先做快照（C层一次性拷贝，不受并发插入影响），再构建任务信息
+        snapshot = tuple(self.tasks.values())
+        return [task.get_info() for task in snapshot]
+    
+    def get_tasks_page(self, offset: int = 0,
+                       limit: Optional[int] = None) -> Tuple[int, List[ManagedTask]]:
+        """
+        分页获取任务对象
+        
+        Args:
+            offset: 起始偏移量
+            limit: 最大返回数量，如果为None则返回offset之后的全部任务
+            
+        Returns:
+            Tuple[int, List[ManagedTask]]: (任务总数, 当前页任务列表)
+        """
+        tasks = self.tasks
+        total = len(tasks)
+        stop = None if limit is None else offset + limit
+        # islice遍历全程在C层完成，不会与其他线程的插入交错
+        return total, list(islice(tasks.values(), offset, stop))
+    
+    def list_tasks_page(self, offset: int = 0,
+                        limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        分页获取任务信息，只为当前页的任务构建信息字典
+        
+        Args:
+            offset: 起始偏移量
+            limit: 最大返回数量，如果为None则返回offset之后的全部任务
+            
+        Returns:
+            Tuple[int, List[Dict]]: (任务总数, 当前页任务信息列表)
+        """
+        total, page_tasks = self.get_tasks_page(offset, limit)
+        return total, [task.get_info() for task in page_tasks]
     
     def get_active_tasks(self) -> List[ManagedTask]:
         """
@@ -115,7 +390,8 @@ class ManagedThreadPool:
         Returns:
             List[ManagedTask]: 活跃任务列表
         """
-        return [task for task in self.tasks.values() if not task.is_done()]
+        snapshot = tuple(self.tasks.values())
+        return [task for task in snapshot if not task.is_done()]
     
     def cancel_task(self, task_id: str) -> bool:
         """
@@ -139,16 +415,16 @@ class ManagedThreadPool:
         Returns:
             int: 清理的任务数量
         """
-        with self._lock:
-            completed_task_ids = [
-                task_id for task_id, task in self.tasks.items()
-                if task.is_done()
-            ]
-            
-            for task_id in completed_task_ids:
-                del self.tasks[task_id]
-            
-            return len(completed_task_ids)
+        # 已完成任务ID表记录了所有已计为终态的任务，只需遍历这部分任务；
+        # 任务表原地删除，并发提交的新任务不会因任务表被替换而丢失
+        with self._status_lock:
+            cleaned = len(self._completed_ids)
+            for task_id in self._completed_ids:
+                self._drop_task(task_id)
+            self._completed_ids.clear()
+            self._version += 1
+        
+        return cleaned
     
     def shutdown(self, wait: bool = True):
         """
@@ -158,13 +434,22 @@ class ManagedThreadPool:
             wait: 是否等待所有任务完成
         """
         with self._lock:
-            if self.status == PoolStatus.RUNNING:
-                self.status = PoolStatus.SHUTDOWN
-                self.executor.shutdown(wait=wait)
-                if wait:
-                    self.status = PoolStatus.TERMINATED
-                else:
-                    self.status = PoolStatus.STOPPED
+            if self.status is not _POOL_RUNNING:
+                return
+            self._running = False
+            self.status = PoolStatus.SHUTDOWN
+            executor = self.executor
+            self._touch()
+        
+        # 在锁外等待执行器关闭，期间其他线程仍可查询和取消任务
+        executor.shutdown(wait=wait)
+        
+        with self._lock:
+            if wait:
+                self.status = PoolStatus.TERMINATED
+            else:
+                self.status = PoolStatus.STOPPED
+            self._touch()
     
     def shutdown_now(self) -> List[Any]:
         """
@@ -174,25 +459,52 @@ class ManagedThreadPool:
             List[Any]: 未执行的任务列表
         """
         with self._lock:
-            if self.status == PoolStatus.RUNNING:
-                self.status = PoolStatus.STOPPED
-                
-                # 取消所有待执行的任务
-                cancelled_tasks = []
-                for task in self.tasks.values():
-                    if task.status in [TaskStatus.PENDING, TaskStatus.RUNNING]:
-                        cancelled_tasks.append(task)
-                
-                # 立即关闭线程池
-                self.executor.shutdown(wait=False)
-                
-                return cancelled_tasks
-        return []
+            if self.status is not _POOL_RUNNING:
+                return []
+            self._running = False
+            self.status = PoolStatus.STOPPED
+            executor = self.executor
+            self._touch()
+            
+            # 取消所有待执行的任务
+            cancelled_tasks = [
+                task for task in tuple(self.tasks.values())
+                if task.status is _PENDING or task.status is _RUNNING
+            ]
+        
+        # 立即关闭线程池
+        executor.shutdown(wait=False)
+        
+        return cancelled_tasks
+    
+    def _count_active(self) -> int:
+        """根据状态计数获取活跃任务（待执行和运行中）数量，无需遍历任务表"""
+        with self._status_lock:
+            return self._status_counts[_PENDING] + self._status_counts[_RUNNING]
     
     def get_status(self) -> PoolStatus:
         """获取线程池当前状态"""
         return self.status
     
+    def _get_dynamic_info(self) -> Dict[str, Any]:
+        """获取线程池信息中随状态和任务变化的字段"""
+        with self._status_lock:
+            counts = self._status_counts.copy()
+        pending = counts[_PENDING]
+        running = counts[_RUNNING]
+        
+        return {
+            'status': _POOL_STATUS_VALUES[self.status],
+            'total_tasks': sum(counts.values()),
+            'active_tasks': pending + running,
+            'pending_tasks': pending,
+            'running_tasks': running,
+            'completed_tasks': (counts[_COMPLETED] + counts[_FAILED]
+                                + counts[_CANCELLED]),
+            'cancelled_tasks': counts[_CANCELLED],
+            'failed_tasks': counts[_FAILED]
+        }
+    
     def get_info(self) -> Dict[str, Any]:
         """
         获取线程池详细信息
@@ -200,22 +512,24 @@ class ManagedThreadPool:
         Returns:
             Dict[str, Any]: 线程池信息
         """
-        active_tasks = self.get_active_tasks()
-        all_tasks = list(self.tasks.values())
-        
-        return {
+        info = {
             'pool_id': self.pool_id,
             'name': self.name,
-            'status': self.status.value,
-            'max_workers': self.max_workers,
-            'total_tasks': len(all_tasks),
-            'active_tasks': len(active_tasks),
-            'pending_tasks': len([t for t in all_tasks if t.status == TaskStatus.PENDING]),
-            'running_tasks': len([t for t in all_tasks if t.status == TaskStatus.RUNNING]),
-            'completed_tasks': len([t for t in all_tasks if t.is_done()]),
-            'cancelled_tasks': len([t for t in all_tasks if t.status == TaskStatus.CANCELLED]),
-            'failed_tasks': len([t for t in all_tasks if t.status == TaskStatus.FAILED])
+            'max_workers': self.max_workers
         }
+        info.update(self._get_dynamic_info())
+        return info
+    
+    def get_info_bytes(self) -> bytes:
+        """
+        获取序列化为JSON的线程池详细信息
+        
+        不变字段在初始化时已序列化，这里只需序列化动态字段并拼接
+        
+        Returns:
+            bytes: 线程池信息的JSON字节串
+        """
+        return self._static_json + b',' + orjson.dumps(self._get_dynamic_info())[1:]
     
     def __enter__(self):
         """上下文管理器入口"""
@@ -247,7 +561,7 @@ class ManagedThreadPool:
             }
         """
         with self._lock:
-            if self.status != PoolStatus.RUNNING:
+            if self.status is not _POOL_RUNNING:
                 return {
                     'success': False,
                     'message': f"线程池 {self.pool_id} 当前状态为 {self.status.value}，无法调整大小"
@@ -266,68 +580,71 @@ class ManagedThreadPool:
                 }
             
             try:
-                # 获取当前所有任务
-                all_tasks = list(self.tasks.values())
+                # 单次遍历当前所有任务，按状态分类
+                pending_tasks, running_tasks, completed_tasks = [], [], []
+                for task in tuple(self.tasks.values()):
+                    status = task.status
+                    if status is _PENDING:
+                        pending_tasks.append(task)
+                    elif status is _RUNNING:
+                        running_tasks.append(task)
+                    else:
+                        completed_tasks.append(task)
                 
-                # 分类任务状态
-                pending_tasks = [task for task in all_tasks if task.status == TaskStatus.PENDING]
-                running_tasks = [task for task in all_tasks if task.status == TaskStatus.RUNNING]
-                completed_tasks = [task for task in all_tasks if task.is_done()]
+                # 创建新执行器
+                new_executor = self._create_executor(new_max_workers)
                 
-                # 创建新线程池（使用相同的pool_id和name）
-                new_pool = ManagedThreadPool(
-                    pool_id=self.pool_id,
-                    name=self.name,
-                    max_workers=new_max_workers
-                )
-                
-                # 迁移待执行任务
+                # 迁移待执行任务，任务本身保留在原任务表中
                 migrated_count = 0
                 for task in pending_tasks:
+                    old_future = task.future
+                    if old_future is None:
+                        # 正在提交中的任务由提交方负责投递到新执行器
+                        continue
+                    # 先解除任务与旧future的关联，取消旧future触发的回调会被忽略
+                    task.future = None
+                    if not old_future.cancel():
+                        # 旧future已开始运行，任务留在老执行器中完成
+                        task.future = old_future
+                        if old_future.done():
+                            # 解除关联期间完成的回调已被忽略，这里补发
+                            task._on_task_complete(old_future)
+                        continue
+                    if task.status in _DONE_STATUSES:
+                        # 分类之后已被取消的任务不再重新提交
+                        task.future = old_future
+                        continue
                     try:
-                        # 重新提交任务到新线程池
-                        new_future = new_pool.executor.submit(task.start)
+                        # 重新提交任务到新执行器
+                        new_future = new_executor.submit(task.start)
                         task.set_future(new_future)
-                        new_pool.tasks[task.task_id] = task
                         migrated_count += 1
                     except Exception as e:
                         # 如果迁移失败，标记任务为失败状态
-                        task.status = TaskStatus.FAILED
-                        task.error = str(e)
+                        task.mark_failed(e)
                 
-                # 迁移运行中的任务（这些任务会继续在老线程池中完成）
-                for task in running_tasks:
-                    # 运行中的任务不迁移，但保留在任务列表中
-                    new_pool.tasks[task.task_id] = task
+                # 运行中的任务不迁移，继续在老执行器中完成
                 
                 # 清理已完成的任务
                 cleanup_count = len(completed_tasks)
-                
-                # 优雅关闭老线程池
-                self.executor.shutdown(wait=False)
-                self.status = PoolStatus.TERMINATED
+                self._untrack_tasks(completed_tasks)
                 
                 # 更新内部引用
                 old_executor = self.executor
-                self.executor = new_pool.executor
+                old_max_workers = self.max_workers
+                self.executor = new_executor
                 self.max_workers = new_max_workers
-                self.tasks = new_pool.tasks
-                self.status = PoolStatus.RUNNING
-                
-                # 确保老线程池完全关闭
-                try:
-                    old_executor.shutdown(wait=False)
-                except:
-                    pass
+                self._cache_static_json()
+                self._touch()
                 
-                return {
+                result = {
                     'success': True,
                     'old_pool_id': self.pool_id,
-                    'new_pool_id': new_pool.pool_id,
+                    'new_pool_id': self.pool_id,
                     'migrated_tasks': migrated_count,
                     'completed_tasks': cleanup_count,
                     'running_tasks': len(running_tasks),
-                    'message': f"成功调整线程池 {self.pool_id} 大小从 {self.max_workers} 到 {new_max_workers}"
+                    'message': f"成功调整线程池 {self.pool_id} 大小从 {old_max_workers} 到 {new_max_workers}"
                 }
                 
             except Exception as e:
@@ -335,6 +652,11 @@ class ManagedThreadPool:
                     'success': False,
                     'message': f"调整线程池大小失败: {str(e)}"
                 }
+        
+        # 在锁外关闭老执行器：已迁移任务的旧future均已取消，
+        # 运行中和提交途中的任务继续在老执行器中完成
+        old_executor.shutdown(wait=False)
+        return result
     
     def get_resize_info(self) -> Dict[str, Any]:
         """
@@ -344,15 +666,15 @@ class ManagedThreadPool:
             Dict[str, Any]: 包含当前状态和调整建议的信息
         """
         with self._lock:
-            active_tasks = self.get_active_tasks()
+            active_count = self._count_active()
             return {
                 'pool_id': self.pool_id,
                 'name': self.name,
                 'current_max_workers': self.max_workers,
-                'active_tasks': len(active_tasks),
-                'can_resize': self.status == PoolStatus.RUNNING,
-                'status': self.status.value,
-                'suggested_max_workers': max(1, len(active_tasks) + 2)  # 建议值
+                'active_tasks': active_count,
+                'can_resize': self.status is _POOL_RUNNING,
+                'status': _POOL_STATUS_VALUES[self.status],
+                'suggested_max_workers': max(1, active_count + 2)  # 建议值
             }
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -2,6 +2,7 @@
 任务包装器实现
 """
 
+import time
 import uuid
 from datetime import datetime
 from typing import Any, Optional, Callable
@@ -10,13 +11,28 @@ from concurrent.futures import Future
 from .enums import TaskStatus
 
 
+# 任务终态，进入后状态不再变更
+_DONE_STATUSES = frozenset((TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED))
+
+# 任务状态到字符串值的查找表
+_TASK_STATUS_VALUES = {status: status.value for status in TaskStatus}
+
+
 class ManagedTask:
     """
     对任务的包装，提供额外的管理功能
     """
     
+    # 任务对象数量可能很大，使用__slots__省去每个实例的__dict__
+    __slots__ = (
+        'task_id', 'name', 'pool_id', 'future', 'task_func', 'args', 'kwargs',
+        '_submit_ns', '_wall_submit', '_start_ns', '_end_ns',
+        'status', 'result', 'exception', 'status_listener', '_cached_info'
+    )
+    
     def __init__(self, task_id: str, name: str, pool_id: str, task_func: Callable, 
-                 future: Future=None, args=(), kwargs=None):
+                 future: Future=None, args=(), kwargs=None,
+                 status_listener: Optional[Callable[['ManagedTask', TaskStatus, TaskStatus], None]] = None):
         """
         初始化任务包装器
         
@@ -27,6 +43,7 @@ class ManagedTask:
             future: concurrent.futures.Future对象
             task_func: 要执行的任务函数
             *args, **kwargs: 任务函数的参数
+            status_listener: 状态变更回调，参数为(任务, 旧状态, 新状态)
         """
         self.task_id = task_id
         self.name = name
@@ -36,22 +53,65 @@ class ManagedTask:
         self.args = args
         self.kwargs = kwargs or {}
         
-        # 时间相关
-        self.submit_time = datetime.now()
-        self.start_time: Optional[datetime] = None
-        self.end_time: Optional[datetime] = None
+        # 时间相关：使用单调时钟纳秒数记录，只在需要展示时换算为墙上时间
+        self._submit_ns = time.monotonic_ns()
+        self._wall_submit = time.time()
+        self._start_ns: Optional[int] = None
+        self._end_ns: Optional[int] = None
         
         # 状态相关
         self.status = TaskStatus.PENDING
         self.result: Any = None
         self.exception: Optional[Exception] = None
+        self.status_listener = status_listener
+        # 任务完成后信息不再变化，首次获取后缓存
+        self._cached_info: Optional[dict] = None
         
-        # 添加回调以跟踪状态变化
+    def _to_datetime(self, monotonic_ns: Optional[int]) -> Optional[datetime]:
+        """将单调时钟纳秒数换算为本地墙上时间"""
+        if monotonic_ns is None:
+            return None
+        return datetime.fromtimestamp(
+            self._wall_submit + (monotonic_ns - self._submit_ns) / 1e9)
+    
+    @property
+    def submit_time(self) -> datetime:
+        """任务提交时间"""
+        return datetime.fromtimestamp(self._wall_submit)
+    
+    @property
+    def start_time(self) -> Optional[datetime]:
+        """任务开始运行时间"""
+        return self._to_datetime(self._start_ns)
+    
+    @property
+    def end_time(self) -> Optional[datetime]:
+        """任务结束时间"""
+        return self._to_datetime(self._end_ns)
+    
+    def _set_status(self, status: TaskStatus) -> bool:
+        """
+        切换任务状态并通知状态监听者
         
+        Args:
+            status: 新状态
+            
+        Returns:
+            bool: 状态是否发生变化（终态不会再被改变）
+        """
+        old_status = self.status
+        if old_status is status or old_status in _DONE_STATUSES:
+            return False
+        self.status = status
+        if self.status_listener is not None:
+            self.status_listener(self, old_status, status)
+        return True
+    
     def set_future(self, future: Future):
         """设置任务的Future对象"""
         self.future = future
         self.future.add_done_callback(self._on_task_complete)
+    
     def _on_task_complete(self, future: Future):
         """
         任务完成时的回调函数
@@ -59,22 +119,38 @@ class ManagedTask:
         Args:
             future: 完成的任务future
         """
-        self.end_time = datetime.now()
+        # 忽略已被替换的旧future（例如调整线程池大小后迁移的任务）；
+        # 正常执行结束的任务已由start()在工作线程中记录结果，无需再读取future
+        if future is not self.future or self.status in _DONE_STATUSES:
+            return
+        
+        self._end_ns = time.monotonic_ns()
         
         if future.cancelled():
-            self.status = TaskStatus.CANCELLED
+            self._set_status(TaskStatus.CANCELLED)
         elif future.exception():
-            self.status = TaskStatus.FAILED
             self.exception = future.exception()
+            self._set_status(TaskStatus.FAILED)
         else:
-            self.status = TaskStatus.COMPLETED
             self.result = future.result()
+            self._set_status(TaskStatus.COMPLETED)
     
     def mark_running(self):
         """标记任务开始运行"""
-        if self.status == TaskStatus.PENDING:
-            self.status = TaskStatus.RUNNING
-            self.start_time = datetime.now()
+        if self.status is TaskStatus.PENDING:
+            self._start_ns = time.monotonic_ns()
+            self._set_status(TaskStatus.RUNNING)
+    
+    def mark_failed(self, exception: Exception):
+        """
+        标记任务执行失败
+        
+        Args:
+            exception: 导致失败的异常
+        """
+        self.exception = exception
+        self._end_ns = time.monotonic_ns()
+        self._set_status(TaskStatus.FAILED)
     
     def cancel(self) -> bool:
         """
@@ -83,18 +159,16 @@ class ManagedTask:
         Returns:
             bool: 是否成功取消
         """
-        if self.status == TaskStatus.PENDING:
-            success = self.future.cancel()
+        # 只读取一次future：调整线程池大小时会在任务之外临时将其置为None
+        future = self.future
+        if future is None:
+            # 任务尚未投递到执行器，或正在迁移到新执行器
+            return False
+        if self.status is TaskStatus.PENDING or self.status is TaskStatus.RUNNING:
+            success = future.cancel()
             if success:
-                self.status = TaskStatus.CANCELLED
-                self.end_time = datetime.now()
-            return success
-        elif self.status == TaskStatus.RUNNING:
-            # 对于运行中的任务，尝试取消
-            success = self.future.cancel()
-            if success:
-                self.status = TaskStatus.CANCELLED
-                self.end_time = datetime.now()
+                self._end_ns = time.monotonic_ns()
+                self._set_status(TaskStatus.CANCELLED)
             return success
         return False
     
@@ -121,25 +195,56 @@ class ManagedTask:
         """
         获取任务详细信息
         
+        已完成任务的信息字典会被缓存并在多次调用间共享，调用方不应修改。
+        
         Returns:
             dict: 任务信息字典
         """
+        if self._cached_info is not None:
+            return self._cached_info
+        
+        # 先读取状态：构建期间任务完成时本次结果不缓存，下次调用再构建
+        done = self.status in _DONE_STATUSES
+        info = self._build_info()
+        if done:
+            self._cached_info = info
+        return info
+    
+    def _build_info(self) -> dict:
+        """构建任务信息字典"""
+        start_time = self.start_time
+        end_time = self.end_time
         return {
             'task_id': self.task_id,
             'name': self.name,
             'pool_id': self.pool_id,
-            'status': self.status.value,
+            'status': _TASK_STATUS_VALUES[self.status],
             'submit_time': self.submit_time.isoformat(),
-            'start_time': self.start_time.isoformat() if self.start_time else None,
-            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'start_time': start_time.isoformat() if start_time else None,
+            'end_time': end_time.isoformat() if end_time else None,
             'result': str(self.result) if self.result is not None else None,
             'exception': str(self.exception) if self.exception else None,
             'running_time': self._get_running_time()
         }
+    
     def start(self, *args, **kwargs):
-        """启动任务"""
+        """启动任务，并在工作线程中直接记录执行结果"""
+        if self.status in _DONE_STATUSES:
+            # 迁移到新执行器途中已被取消的任务不再执行
+            return None
         self.mark_running()
-        return self.task_func(*self.args, **self.kwargs) 
+        try:
+            result = self.task_func(*self.args, **self.kwargs)
+        except BaseException as e:
+            self.exception = e
+            self._end_ns = time.monotonic_ns()
+            self._set_status(TaskStatus.FAILED)
+            raise
+        self.result = result
+        self._end_ns = time.monotonic_ns()
+        self._set_status(TaskStatus.COMPLETED)
+        return result
+
     def _get_running_time(self) -> Optional[float]:
         """
         获取任务运行时间（秒）
@@ -147,20 +252,20 @@ class ManagedTask:
         Returns:
             float: 运行时间（秒），如果未开始运行返回None
         """
-        if not self.start_time:
+        if self._start_ns is None:
             return None
         
-        end_time = self.end_time or datetime.now()
-        return (end_time - self.start_time).total_seconds()
+        end_ns = self._end_ns if self._end_ns is not None else time.monotonic_ns()
+        return (end_ns - self._start_ns) / 1e9
     
     def is_done(self) -> bool:
         """检查任务是否已完成"""
-        return self.status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]
+        return self.status in _DONE_STATUSES
     
     def is_running(self) -> bool:
         """检查任务是否正在运行"""
-        return self.status == TaskStatus.RUNNING
+        return self.status is TaskStatus.RUNNING
     
     def is_pending(self) -> bool:
         """检查任务是否待执行"""
-        return self.status == TaskStatus.PENDING
\ No newline at end of file
+        return self.status is TaskStatus.PENDING
\ No newline at end of file
@@ -2,9 +2,11 @@
 线程池管理器实现
 """
 
-import uuid
+import os
+import itertools
 import threading
-from typing import Dict, List, Optional, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from datetime import datetime, timedelta
 import logging
 
@@ -19,22 +21,119 @@ from .exceptions import (
 )
 
 
+# 线程池表和全局任务表的分片数
+_STRIPE_COUNT = 16
+
+# 线程池ID由进程级随机前缀和自增计数组成，创建线程池时无需生成UUID
+_POOL_ID_PREFIX = os.urandom(4).hex()
+_pool_id_counter = itertools.count(1)
+
+
+def _next_pool_id() -> str:
+    """生成进程内唯一的线程池ID"""
+    return f"{_POOL_ID_PREFIX}{next(_pool_id_counter):08x}"
+
+
 class ThreadPoolManager:
     """
     线程池管理器，统一管理所有线程池和任务
     """
     
+    # 每完成多少个任务触发一次后台清理
+    CLEANUP_THRESHOLD = 1024
+    
     def __init__(self):
         """初始化线程池管理器"""
-        self.pools: Dict[str, ManagedThreadPool] = {}
-        self.tasks: Dict[str, ManagedTask] = {}  # 全局任务注册表
-        self._lock = threading.RLock()
-        self._cleanup_thread: Optional[threading.Thread] = None
-        self._stop_cleanup = threading.Event()
+        # 线程池表和全局任务注册表按ID哈希分片，每个分片为(锁, 线程池表, 任务表)。
+        # 任务表的单键插入、查找和删除在GIL下是原子的，无需加锁；
+        # 分片锁只用于线程池表的修改和任务表的批量清理
+        self._stripes: List[Tuple[threading.Lock, Dict[str, ManagedThreadPool],
+                                  Dict[str, ManagedTask]]] = [
+            (threading.Lock(), {}, {}) for _ in range(_STRIPE_COUNT)
+        ]
+        # 按创建顺序排列的线程池表，列表和分页按此顺序遍历；只在全局锁内修改
+        self._pool_order: Dict[str, ManagedThreadPool] = {}
+        # 线程池名称到线程池ID的映射，创建时检查名称是否重复；只在全局锁内修改
+        self._pool_names: Dict[str, str] = {}
+        # 每个线程池在全局任务表中的任务ID集合，关闭线程池时无需扫描全部任务
+        self._pool_task_ids: Dict[str, set] = {}
+        # 全局锁只用于线程池的创建、关闭等低频的结构性操作
+        self._lock = threading.Lock()
+        # 版本号，线程池增删或全局任务表变化时在全局锁内递增
+        self._version = 0
+        # 按完成任务数触发清理，而不是定时轮询；同一时间最多只有一个清理在排队或执行
+        self._done_counter = itertools.count(1)
+        self._cleanup_pending = threading.Lock()
+        self._cleanup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cleanup')
         self.logger = logging.getLogger(__name__)
+    
+    def _stripe(self, key: str) -> Tuple[threading.Lock, Dict[str, ManagedThreadPool],
+                                         Dict[str, ManagedTask]]:
+        """获取ID所在的分片"""
+        return self._stripes[hash(key) % _STRIPE_COUNT]
+    
+    @property
+    def pools(self) -> Dict[str, ManagedThreadPool]:
+        """所有分片线程池表的合并视图（逐个分片拷贝，不保证全局一致）"""
+        merged = {}
+        for lock, pools, _ in self._stripes:
+            with lock:
+                merged.update(pools)
+        return merged
+    
+    def _snapshot_pools(self) -> List[ManagedThreadPool]:
+        """获取所有线程池对象按创建顺序排列的快照，调用方在快照上计算信息，不持有任何锁"""
+        return list(self._pool_order.values())
+    
+    @property
+    def tasks(self) -> Dict[str, ManagedTask]:
+        """所有分片全局任务表的合并视图（逐个分片拷贝，不保证全局一致）"""
+        merged = {}
+        for lock, _, tasks in self._stripes:
+            with lock:
+                merged.update(tasks)
+        return merged
+    
+    def _remove_pool_tasks(self, pool_id: str, done: bool) -> List[str]:
+        """
+        从全局任务表中移除指定线程池的任务
         
-        # 启动清理线程
-        self._start_cleanup_thread()
+        Args:
+            pool_id: 线程池ID
+            done: True移除已完成的任务，False移除未完成的任务
+            
+        Returns:
+            List[str]: 被移除的任务ID列表
+        """
+        removed = []
+        task_ids = self._pool_task_ids.get(pool_id)
+        if not task_ids:
+            return removed
+        # 基于快照遍历，并发提交的任务加入集合不会影响遍历
+        for task_id in tuple(task_ids):
+            tasks = self._stripe(task_id)[2]
+            task = tasks.get(task_id)
+            if task is None:
+                task_ids.discard(task_id)
+            elif task.is_done() is done:
+                tasks.pop(task_id, None)
+                task_ids.discard(task_id)
+                removed.append(task_id)
+        return removed
+    
+    def _forget_pool(self, pool_id: str):
+        """从创建顺序表、名称表和任务ID表中移除线程池（调用方需持有_lock）"""
+        pool = self._pool_order.pop(pool_id, None)
+        if pool is not None and self._pool_names.get(pool.name) == pool_id:
+            del self._pool_names[pool.name]
+        self._pool_task_ids.pop(pool_id, None)
+    
+    def _discard_task_id(self, task: ManagedTask):
+        """从所属线程池的任务ID集合中移除任务"""
+        task_ids = self._pool_task_ids.get(task.pool_id)
+        if task_ids is not None:
+            task_ids.discard(task.task_id)
+    
     # 停止线程池未执行future
     def cancel_pool_tasks(self, pool_id: str) -> bool:
         """
@@ -46,37 +145,42 @@ class ThreadPoolManager:
         Returns:
             bool: 是否成功停止
         """
-        with self._lock:
-            pool = self.get_pool(pool_id)
-            pool.cancel_tasks()
-            self.logger.info(f"Canceled tasks in pool {pool_id}")
-            return True
+        pool = self.get_pool(pool_id)
+        pool.cancel_tasks()
+        self.logger.info("Canceled tasks in pool %s", pool_id)
+        return True
             
     def create_pool(self, name: str = None, max_workers: int = None) -> str:
         """
         创建新的线程池
         
         Args:
-            name: 线程池名称，如果为None则使用UUID
+            name: 线程池名称，如果为None则根据线程池ID生成
             max_workers: 最大工作线程数
             
         Returns:
             str: 线程池ID
         """
         with self._lock:
-            pool_id = str(uuid.uuid4())
+            pool_id = _next_pool_id()
             if not name:
-                name = f"pool-{pool_id[:8]}"
+                name = f"pool-{pool_id[-8:]}"
             
             # 检查名称是否已存在
-            for pool in self.pools.values():
-                if pool.name == name:
-                    raise PoolAlreadyExistsError(f"Pool with name '{name}' already exists")
-            
-            pool = ManagedThreadPool(pool_id, name, max_workers)
-            self.pools[pool_id] = pool
-            
-            self.logger.info(f"Created pool {pool_id} with name '{name}'")
+            if name in self._pool_names:
+                raise PoolAlreadyExistsError(f"Pool with name '{name}' already exists")
+            
+            pool = ManagedThreadPool(pool_id, name, max_workers,
+                                     task_done_listener=self._on_task_done)
+            self._pool_task_ids[pool_id] = set()
+            lock, pools, _ = self._stripe(pool_id)
+            with lock:
+                pools[pool_id] = pool
+            self._pool_order[pool_id] = pool
+            self._pool_names[name] = pool_id
+            self._version += 1
+            
+            self.logger.info("Created pool %s with name '%s'", pool_id, name)
             return pool_id
     
     def get_pool(self, pool_id: str) -> ManagedThreadPool:
@@ -92,7 +196,7 @@ class ThreadPoolManager:
         Raises:
             PoolNotFoundError: 如果线程池不存在
         """
-        pool = self.pools.get(pool_id)
+        pool = self._stripe(pool_id)[1].get(pool_id)
         if not pool:
             raise PoolNotFoundError(f"Pool {pool_id} not found")
         return pool
@@ -108,34 +212,36 @@ class ThreadPoolManager:
         Returns:
             bool: 是否成功关闭
         """
-        with self._lock:
-            pool = self.get_pool(pool_id)
+        pool = self.get_pool(pool_id)
+        
+        try:
+            # 等待线程池关闭期间不持有管理器锁，其他线程池的操作不受影响
+            pool.shutdown(wait=wait)
             
-            try:
-                pool.shutdown(wait=wait)
-                
+            with self._lock:
                 # 清理该线程池的所有任务
-                pool_tasks = [
-                    task_id for task_id, task in self.tasks.items()
-                    if task.pool_id == pool_id and task.is_done()
-                ]
-                for task_id in pool_tasks:
-                    del self.tasks[task_id]
+                self._remove_pool_tasks(pool_id, done=True)
                 
                 # 从管理器中移除线程池
-                del self.pools[pool_id]
-                
-                self.logger.info(f"Closed pool {pool_id}")
-                return True
-                
-            except Exception as e:
-                self.logger.error(f"Error closing pool {pool_id}: {e}")
-                return False
+                lock, pools, _ = self._stripe(pool_id)
+                with lock:
+                    pools.pop(pool_id, None)
+                self._forget_pool(pool_id)
+                self._version += 1
+            
+            self.logger.info("Closed pool %s", pool_id)
+            return True
+            
+        except Exception as e:
+            self.logger.error("Error closing pool %s: %s", pool_id, e)
+            return False
     
     def force_close_pool(self, pool_id: str) -> List[str]:
         """
         强制关闭线程池，取消所有未完成的任务
         
+        线程池不存在（例如已被关闭）时直接返回空列表，可重复调用。
+        
         Args:
             pool_id: 线程池ID
             
@@ -143,26 +249,24 @@ class ThreadPoolManager:
             List[str]: 被取消的任务ID列表
         """
         with self._lock:
-            pool = self.get_pool(pool_id)
+            lock, pools, _ = self._stripe(pool_id)
+            pool = pools.get(pool_id)
+            if pool is None:
+                return []
             
-            # 获取该线程池的所有活跃任务
-            active_tasks = [
-                task_id for task_id, task in self.tasks.items()
-                if task.pool_id == pool_id and not task.is_done()
-            ]
+            # 获取并清理该线程池的所有活跃任务
+            active_tasks = self._remove_pool_tasks(pool_id, done=False)
             
             # 立即关闭线程池
             cancelled_tasks = pool.shutdown_now()
             
-            # 清理任务
-            for task_id in active_tasks:
-                if task_id in self.tasks:
-                    del self.tasks[task_id]
-            
             # 移除线程池
-            del self.pools[pool_id]
+            with lock:
+                del pools[pool_id]
+            self._forget_pool(pool_id)
+            self._version += 1
             
-            self.logger.info(f"Force closed pool {pool_id}, cancelled {len(active_tasks)} tasks")
+            self.logger.info("Force closed pool %s, cancelled %s tasks", pool_id, len(active_tasks))
             return active_tasks
     
     def submit_task(self, pool_id: str, task_func: Callable, 
@@ -179,20 +283,87 @@ class ThreadPoolManager:
         Returns:
             str: 任务ID
             
+        Raises:
+            PoolNotFoundError: 如果线程池不存在
+        """
+        return self.submit_task_obj(pool_id, task_func, task_name, *args, **kwargs).task_id
+    
+    def submit_task_obj(self, pool_id: str, task_func: Callable,
+                        task_name: str = None, *args, **kwargs) -> ManagedTask:
+        """
+        向指定线程池提交任务，直接返回任务对象，免去再按ID查找任务
+        
+        Args:
+            pool_id: 线程池ID
+            task_func: 要执行的任务函数
+            task_name: 任务名称
+            *args, **kwargs: 任务函数参数
+            
+        Returns:
+            ManagedTask: 任务对象
+            
         Raises:
             PoolNotFoundError: 如果线程池不存在
         """
         pool = self.get_pool(pool_id)
         
-        with self._lock:
-            task_id,future = pool.submit(task_func, task_name, *args, **kwargs)
-            task = pool.get_task(task_id)
+        task = pool.submit_task_obj(task_func, task_name, *args, **kwargs)
+        task_id = task.task_id
+        
+        # 注册到全局任务表（单键赋值和集合添加在GIL下都是原子的）
+        self._stripe(task_id)[2][task_id] = task
+        task_ids = self._pool_task_ids.get(pool_id)
+        if task_ids is not None:
+            task_ids.add(task_id)
+        
+        self.logger.info("Submitted task %s to pool %s", task_id, pool_id)
+        return task
+    
+    def submit_many(self, pool_id: str,
+                    jobs: List[Tuple[Callable, Optional[str], tuple, Optional[dict]]]) -> List[str]:
+        """
+        向指定线程池批量提交任务
+        
+        Args:
+            pool_id: 线程池ID
+            jobs: 任务列表，每项为(任务函数, 任务名称, 位置参数元组, 关键字参数字典)
             
-            # 注册到全局任务表
-            self.tasks[task_id] = task
+        Returns:
+            List[str]: 按提交顺序排列的任务ID列表
             
-            self.logger.info(f"Submitted task {task_id} to pool {pool_id}")
-            return task_id
+        Raises:
+            PoolNotFoundError: 如果线程池不存在
+        """
+        return [task.task_id for task in self.submit_many_obj(pool_id, jobs)]
+    
+    def submit_many_obj(self, pool_id: str,
+                        jobs: List[Tuple[Callable, Optional[str], tuple, Optional[dict]]]) -> List[ManagedTask]:
+        """
+        向指定线程池批量提交任务，直接返回任务对象，免去再按ID查找任务
+        
+        Args:
+            pool_id: 线程池ID
+            jobs: 任务列表，每项为(任务函数, 任务名称, 位置参数元组, 关键字参数字典)
+            
+        Returns:
+            List[ManagedTask]: 按提交顺序排列的任务对象列表
+            
+        Raises:
+            PoolNotFoundError: 如果线程池不存在
+        """
+        pool = self.get_pool(pool_id)
+        
+        tasks = pool.submit_many_obj(jobs)
+        
+        # 批量注册到全局任务表；任务可能已被线程池按历史上限淘汰，仍直接使用返回的任务对象
+        for task in tasks:
+            self._stripe(task.task_id)[2][task.task_id] = task
+        pool_task_ids = self._pool_task_ids.get(pool_id)
+        if pool_task_ids is not None:
+            pool_task_ids.update(task.task_id for task in tasks)
+        
+        self.logger.info("Submitted %s tasks to pool %s", len(tasks), pool_id)
+        return tasks
     
     def cancel_task(self, task_id: str) -> bool:
         """
@@ -204,7 +375,8 @@ class ThreadPoolManager:
         Returns:
             bool: 是否成功取消
         """
-        task = self.tasks.get(task_id)
+        tasks = self._stripe(task_id)[2]
+        task = tasks.get(task_id)
         if not task:
             return False
         
@@ -213,7 +385,8 @@ class ThreadPoolManager:
         
         if success and task.is_done():
             # 清理已完成的任务
-            del self.tasks[task_id]
+            tasks.pop(task_id, None)
+            self._discard_task_id(task)
         
         return success
     
@@ -244,7 +417,7 @@ class ThreadPoolManager:
         Raises:
             TaskNotFoundError: 如果任务不存在
         """
-        task = self.tasks.get(task_id)
+        task = self._stripe(task_id)[2].get(task_id)
         if not task:
             raise TaskNotFoundError(f"Task {task_id} not found")
         return task
@@ -256,8 +429,25 @@ class ThreadPoolManager:
         Returns:
             List[Dict]: 线程池信息列表
         """
-        with self._lock:
-            return [pool.get_info() for pool in self.pools.values()]
+        return [pool.get_info() for pool in self._snapshot_pools()]
+    
+    def list_pools_bytes(self) -> bytes:
+        """
+        获取所有线程池信息，直接序列化为JSON数组
+        
+        Returns:
+            bytes: 线程池信息列表的JSON字节串
+        """
+        return b'[' + b','.join(pool.get_info_bytes() for pool in self._snapshot_pools()) + b']'
+    
+    def count_pools(self) -> int:
+        """
+        获取线程池数量，不构建线程池信息
+        
+        Returns:
+            int: 线程池数量
+        """
+        return sum(len(pools) for _, pools, _ in self._stripes)
     
     def list_tasks(self, pool_id: str = None) -> List[Dict[str, Any]]:
         """
@@ -269,24 +459,93 @@ class ThreadPoolManager:
         Returns:
             List[Dict]: 任务信息列表
         """
-        with self._lock:
-            if pool_id:
-                # 获取指定线程池的任务
-                pool = self.get_pool(pool_id)
-                return pool.list_tasks()
-            else:
-                # 获取所有任务
-                return [task for pool in self.pools.values() for task in pool.list_tasks()]
+        if pool_id:
+            # 获取指定线程池的任务
+            pool = self.get_pool(pool_id)
+            return pool.list_tasks()
+        else:
+            # 获取所有任务
+            return [task for pool in self._snapshot_pools() for task in pool.list_tasks()]
+    
+    def count_tasks(self, pool_id: str = None) -> int:
+        """
+        获取任务数量，与list_tasks的统计范围一致但不构建任务信息
+        
+        Args:
+            pool_id: 线程池ID，如果为None则统计所有线程池的任务
+            
+        Returns:
+            int: 任务数量
+            
+        Raises:
+            PoolNotFoundError: 如果指定的线程池不存在
+        """
+        if pool_id:
+            return self.get_pool(pool_id).task_count
+        return sum(pool.task_count for pool in self._snapshot_pools())
+    
+    def get_tasks_page(self, pool_id: str = None, offset: int = 0,
+                       limit: Optional[int] = None) -> Tuple[int, List[ManagedTask]]:
+        """
+        分页获取任务对象
+        
+        Args:
+            pool_id: 线程池ID，如果为None则在所有线程池的任务中分页
+            offset: 起始偏移量
+            limit: 最大返回数量，如果为None则返回offset之后的全部任务
+            
+        Returns:
+            Tuple[int, List[ManagedTask]]: (任务总数, 当前页任务列表)
+        """
+        if pool_id:
+            pool = self.get_pool(pool_id)
+            return pool.get_tasks_page(offset, limit)
+        
+        # 按线程池顺序拼接，与list_tasks的顺序保持一致
+        total = 0
+        page = []
+        for pool in self._snapshot_pools():
+            pool_offset = max(0, offset - total)
+            pool_limit = None if limit is None else max(0, limit - len(page))
+            pool_total, pool_page = pool.get_tasks_page(pool_offset, pool_limit)
+            total += pool_total
+            page.extend(pool_page)
+        return total, page
+    
+    def list_tasks_page(self, pool_id: str = None, offset: int = 0,
+                        limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        分页获取任务列表，只为当前页的任务构建信息字典
+        
+        Args:
+            pool_id: 线程池ID，如果为None则在所有线程池的任务中分页
+            offset: 起始偏移量
+            limit: 最大返回数量，如果为None则返回offset之后的全部任务
+            
+        Returns:
+            Tuple[int, List[Dict]]: (任务总数, 当前页任务信息列表)
+        """
+        total, page_tasks = self.get_tasks_page(pool_id, offset, limit)
+        return total, [task.get_info() for task in page_tasks]
+    
     def clear_stopped_pools(self):
         """清理已停止的线程池"""
         with self._lock:
-            stopped_pools = [
-                pool_id for pool_id, pool in self.pools.items()
-                if pool.status in [PoolStatus.STOPPED,PoolStatus.TERMINATED]
-            ]
-            
-            for pool_id in stopped_pools:
-                del self.pools[pool_id]
+            cleared = False
+            for lock, pools, _ in self._stripes:
+                with lock:
+                    stopped_pools = [
+                        pool_id for pool_id, pool in pools.items()
+                        if pool.status in [PoolStatus.STOPPED,PoolStatus.TERMINATED]
+                    ]
+                    
+                    for pool_id in stopped_pools:
+                        del pools[pool_id]
+                        self._forget_pool(pool_id)
+                cleared = cleared or bool(stopped_pools)
+            if cleared:
+                self._version += 1
+    
     def cleanup_completed_tasks(self) -> int:
         """
         清理已完成的任务
@@ -295,21 +554,22 @@ class ThreadPoolManager:
             int: 清理的任务数量
         """
         with self._lock:
-            completed_task_ids = [
-                task_id for task_id, task in self.tasks.items()
-                if task.is_done()
-            ]
-            
-            for task_id in completed_task_ids:
-                del self.tasks[task_id]
+            total_cleaned = 0
+            for lock, _, tasks in self._stripes:
+                with lock:
+                    # 单次遍历快照并原地删除；不重建任务表，避免丢失无锁插入的新任务
+                    for task_id, task in tuple(tasks.items()):
+                        if task.is_done() and tasks.pop(task_id, None) is not None:
+                            self._discard_task_id(task)
+                            total_cleaned += 1
             
             # 清理每个线程池的已完成任务
-            total_cleaned = len(completed_task_ids)
-            for pool in self.pools.values():
+            for pool in self._snapshot_pools():
                 total_cleaned += pool.cleanup_completed_tasks()
             
             if total_cleaned > 0:
-                self.logger.info(f"Cleaned up {total_cleaned} completed tasks")
+                self._version += 1
+                self.logger.info("Cleaned up %s completed tasks", total_cleaned)
             
             return total_cleaned
     
@@ -320,50 +580,83 @@ class ThreadPoolManager:
         Returns:
             Dict[str, Any]: 统计信息
         """
-        with self._lock:
-            total_tasks = len(self.tasks)
-            active_tasks = len([t for t in self.tasks.values() if not t.is_done()])
-            
-            return {
-                'total_pools': len(self.pools),
-                'total_tasks': total_tasks,
-                'active_tasks': active_tasks,
-                'completed_tasks': total_tasks - active_tasks
-            }
-    
-    def _start_cleanup_thread(self):
-        """启动清理线程"""
-        def cleanup_worker():
-            while not self._stop_cleanup.wait(timeout=300):  # 每5分钟清理一次
-                try:
-                    self.cleanup_completed_tasks()
-                    self.clear_stopped_pools()
-
-                except Exception as e:
-                    self.logger.error(f"Error in cleanup thread: {e}")
+        # 逐个分片在快照上统计，不合并任务表、不持有锁
+        total_pools = 0
+        total_tasks = 0
+        active_tasks = 0
+        for _, pools, tasks in self._stripes:
+            snapshot = tuple(tasks.values())
+            total_pools += len(pools)
+            total_tasks += len(snapshot)
+            active_tasks += sum(1 for task in snapshot if not task.is_done())
         
-        self._cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
-        self._cleanup_thread.start()
+        return {
+            'total_pools': total_pools,
+            'total_tasks': total_tasks,
+            'active_tasks': active_tasks,
+            'completed_tasks': total_tasks - active_tasks
+        }
+    
+    def get_version(self) -> str:
+        """
+        获取管理器状态的版本标识
+        
+        由管理器版本号和各线程池版本号之和组成，线程池增删、任务提交或
+        任务状态变化后返回值都会改变，可用作HTTP ETag。
+        
+        Returns:
+            str: 版本标识
+        """
+        pools = self._snapshot_pools()
+        return f"{self._version}-{sum(pool.get_version() for pool in pools)}"
+    
+    def _on_task_done(self, task: ManagedTask):
+        """任务完成回调，完成任务数每达到清理阈值时调度一次后台清理"""
+        if next(self._done_counter) % self.CLEANUP_THRESHOLD:
+            return
+        if not self._cleanup_pending.acquire(blocking=False):
+            # 已有清理在排队或执行
+            return
+        try:
+            self._cleanup_executor.submit(self._run_cleanup)
+        except RuntimeError:
+            # 管理器正在关闭
+            self._cleanup_pending.release()
+    
+    def _run_cleanup(self):
+        """在后台清理线程中清理已完成的任务和已停止的线程池"""
+        try:
+            self.cleanup_completed_tasks()
+            self.clear_stopped_pools()
+        except Exception as e:
+            self.logger.error("Error in cleanup thread: %s", e)
+        finally:
+            self._cleanup_pending.release()
     
     def shutdown(self):
         """关闭管理器，清理所有资源"""
         self.logger.info("Shutting down ThreadPoolManager")
         
-        # 停止清理线程
-        self._stop_cleanup.set()
-        if self._cleanup_thread and self._cleanup_thread.is_alive():
-            self._cleanup_thread.join(timeout=5)
+        # 停止清理线程，等待正在执行的清理结束
+        self._cleanup_executor.shutdown(wait=True)
+        
+        # 关闭所有线程池（close_pool自行获取全局锁，这里不能持有）
+        for pool in self._snapshot_pools():
+            pool_id = pool.pool_id
+            try:
+                self.close_pool(pool_id, wait=False)
+            except Exception as e:
+                self.logger.error("Error closing pool %s: %s", pool_id, e)
         
-        # 关闭所有线程池
         with self._lock:
-            for pool_id in list(self.pools.keys()):
-                try:
-                    self.close_pool(pool_id, wait=False)
-                except Exception as e:
-                    self.logger.error(f"Error closing pool {pool_id}: {e}")
-            
-            self.pools.clear()
-            self.tasks.clear()
+            for lock, pools, tasks in self._stripes:
+                with lock:
+                    pools.clear()
+                    tasks.clear()
+            self._pool_order.clear()
+            self._pool_names.clear()
+            self._pool_task_ids.clear()
+            self._version += 1
         
         self.logger.info("ThreadPoolManager shutdown complete")
     
@@ -390,24 +683,23 @@ class ThreadPoolManager:
             KeyError: 如果线程池不存在
             ValueError: 如果参数无效
         """
-        with self._lock:
-            if pool_id not in self.pools:
-                raise KeyError(f"线程池 {pool_id} 不存在")
-            
-            pool = self.pools[pool_id]
-            result = pool.resize(new_max_workers)
-            
-            if result['success']:
-                self.logger.info(
-                    f"成功调整线程池 {pool_id} 大小: "
-                    f"max_workers={new_max_workers}, "
-                    f"migrated_tasks={result.get('migrated_tasks', 0)}, "
-                    f"completed_tasks={result.get('completed_tasks', 0)}"
-                )
-            else:
-                self.logger.error(f"调整线程池 {pool_id} 大小失败: {result['message']}")
-            
-            return result
+        # 调整大小由线程池自身的锁保证互斥，这里不持有分片锁
+        pool = self._stripe(pool_id)[1].get(pool_id)
+        if pool is None:
+            raise KeyError(f"线程池 {pool_id} 不存在")
+        
+        result = pool.resize(new_max_workers)
+        
+        if result['success']:
+            self.logger.info(
+                "成功调整线程池 %s 大小: max_workers=%s, migrated_tasks=%s, completed_tasks=%s",
+                pool_id, new_max_workers,
+                result.get('migrated_tasks', 0), result.get('completed_tasks', 0)
+            )
+        else:
+            self.logger.error("调整线程池 %s 大小失败: %s", pool_id, result['message'])
+        
+        return result
     
     def get_pool_resize_info(self, pool_id: str) -> Dict[str, Any]:
         """
@@ -422,9 +714,8 @@ class ThreadPoolManager:
         Raises:
             KeyError: 如果线程池不存在
         """
-        with self._lock:
-            if pool_id not in self.pools:
-                raise KeyError(f"线程池 {pool_id} 不存在")
-            
-            pool = self.pools[pool_id]
-            return pool.get_resize_info()
\ No newline at end of file
+        pool = self._stripe(pool_id)[1].get(pool_id)
+        if pool is None:
+            raise KeyError(f"线程池 {pool_id} 不存在")
+        
+        return pool.get_resize_info()
\ No newline at end of file
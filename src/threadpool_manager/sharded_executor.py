@@ -0,0 +1,216 @@
+"""
+分片工作窃取执行器实现
+"""
+
+import os
+import random
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, List, Optional
+
+
+class _WorkItem:
+    """待执行的工作项"""
+
+    __slots__ = ('future', 'fn', 'args', 'kwargs')
+
+    def __init__(self, future: Future, fn: Callable, args, kwargs):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        """执行工作项并设置Future结果"""
+        if not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except BaseException as exc:
+            self.future.set_exception(exc)
+            # 打断异常回溯与工作项之间的引用环
+            self = None
+        else:
+            self.future.set_result(result)
+
+
+class ShardedExecutor(Executor):
+    """
+    分片工作窃取执行器，接口与ThreadPoolExecutor一致
+
+    每个工作线程拥有独立的双端队列和锁，提交的任务按轮询分配到各分片，
+    避免所有提交者和工作线程争用同一个队列锁。工作线程优先从自己队列的
+    头部取任务，自己的队列为空时从积压最多的分片队列尾部窃取一半任务。
+    没有可取的任务时，工作线程登记为空闲并在自己的事件上等待；提交者只唤醒
+    一个空闲线程，所有线程都忙时提交路径不触碰任何共享的信号对象。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, thread_name_prefix: str = ''):
+        """
+        初始化执行器
+
+        Args:
+            max_workers: 最大工作线程数，同时也是任务队列分片数
+            thread_name_prefix: 工作线程名称前缀
+
+        Raises:
+            ValueError: 如果max_workers小于等于0
+        """
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        if max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0")
+
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix or f"ShardedExecutor-{id(self):x}"
+
+        # 每个分片一个队列和一把锁
+        self._queues: List[deque] = [deque() for _ in range(max_workers)]
+        self._queue_locks = [threading.Lock() for _ in range(max_workers)]
+        # 每个工作线程一个唤醒事件，以及等待唤醒的空闲线程编号；
+        # deque的append和pop在GIL下是原子的，无需额外加锁
+        self._wakeups = [threading.Event() for _ in range(max_workers)]
+        self._idle: deque = deque()
+        self._round_robin = itertools.count()
+
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
+        self._shutdown_lock = threading.Lock()
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """
+        提交任务
+
+        Returns:
+            Future: 任务对应的Future对象
+
+        Raises:
+            RuntimeError: 如果执行器已关闭
+        """
+        # 按需创建工作线程；线程全部创建后，提交路径只获取一个分片锁
+        if len(self._threads) < self._max_workers:
+            with self._shutdown_lock:
+                if not self._shutdown and len(self._threads) < self._max_workers:
+                    self._start_worker()
+        shard_count = len(self._threads) or 1
+
+        future = Future()
+        work_item = _WorkItem(future, fn, args, kwargs)
+        shard = next(self._round_robin) % shard_count
+        with self._queue_locks[shard]:
+            # 在分片锁内检查关闭标志：shutdown会依次获取所有分片锁，
+            # 之后入队的任务都会被拒绝，之前入队的任务都能被工作线程看到
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            self._queues[shard].append(work_item)
+        # 先入队再查看空闲线程：登记为空闲的线程在等待前会重新扫描所有分片，
+        # 因此任务要么被它扫描到，要么它已出现在空闲列表中被这里唤醒
+        try:
+            idle = self._idle.pop()
+        except IndexError:
+            pass
+        else:
+            self._wakeups[idle].set()
+        return future
+
+    def _start_worker(self):
+        """启动一个工作线程（调用方需持有_shutdown_lock）"""
+        index = len(self._threads)
+        thread = threading.Thread(
+            target=self._worker,
+            args=(index,),
+            name=f"{self._thread_name_prefix}_{index}",
+            # 守护线程，解释器退出时不等待队列中剩余的任务
+            daemon=True
+        )
+        thread.start()
+        self._threads.append(thread)
+
+    def _take(self, index: int) -> Optional[_WorkItem]:
+        """优先从自己的分片头部取任务，否则从积压最多的分片尾部窃取一半"""
+        own_queue = self._queues[index]
+        with self._queue_locks[index]:
+            if own_queue:
+                return own_queue.popleft()
+
+        # 无锁读取各分片长度选出积压最多的分片；从随机分片开始扫描，
+        # 积压相同时避免所有空闲线程按相同顺序争抢同一个分片
+        shard_count = len(self._queues)
+        start = random.randrange(shard_count)
+        victim, victim_size = -1, 0
+        for offset in range(shard_count):
+            shard = (start + offset) % shard_count
+            size = len(self._queues[shard])
+            if shard != index and size > victim_size:
+                victim, victim_size = shard, size
+        if victim < 0:
+            return None
+
+        # 一次窃取一半积压任务，减少长任务占住分片时的反复窃取
+        victim_queue = self._queues[victim]
+        with self._queue_locks[victim]:
+            count = (len(victim_queue) + 1) // 2
+            stolen = [victim_queue.pop() for _ in range(count)]
+        if not stolen:
+            return None
+        # 尾部弹出的顺序与提交顺序相反，先执行其中最早提交的任务
+        stolen.reverse()
+        if len(stolen) > 1:
+            # 不同时持有两把分片锁，避免相互窃取时死锁
+            with self._queue_locks[index]:
+                own_queue.extend(stolen[1:])
+        return stolen[0]
+
+    def _worker(self, index: int):
+        """工作线程主循环"""
+        wakeup = self._wakeups[index]
+        while True:
+            work_item = self._take(index)
+            if work_item is None:
+                # 先清除事件再检查关闭标志，关闭时设置的事件不会被清除掉
+                wakeup.clear()
+                if self._shutdown:
+                    # 队列已空且执行器已关闭；被窃取中的任务由窃取方执行
+                    return
+                self._idle.append(index)
+                # 登记后重新扫描，避免错过登记前刚入队、未唤醒任何线程的任务
+                work_item = self._take(index)
+                if work_item is None:
+                    wakeup.wait()
+                    continue
+                try:
+                    self._idle.remove(index)
+                except ValueError:
+                    # 已被提交者取出并唤醒，事件留到下次空闲时清除
+                    pass
+            work_item.run()
+            del work_item
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        """
+        关闭执行器
+
+        Args:
+            wait: 是否等待所有工作线程退出
+            cancel_futures: 是否取消所有尚未开始执行的任务
+        """
+        with self._shutdown_lock:
+            already_shutdown = self._shutdown
+            self._shutdown = True
+            threads = list(self._threads)
+
+        if not already_shutdown:
+            # 依次获取所有分片锁，等待正在入队的提交完成
+            for queue, lock in zip(self._queues, self._queue_locks):
+                with lock:
+                    while cancel_futures and queue:
+                        queue.popleft().future.cancel()
+            # 所有任务入队后才唤醒工作线程，工作线程取完剩余任务后退出
+            for wakeup in self._wakeups:
+                wakeup.set()
+
+        if wait:
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,80 @@
+"""
+测试公共夹具
+"""
+
+import threading
+
+import orjson
+import pytest
+
+
+def _wait_done(tasks, timeout: float = 5) -> bool:
+    """
+    等待一组任务全部结束
+
+    通过future的完成回调递减计数，最后一个任务完成时触发事件，
+    测试线程只在一个事件上等待，而不是逐个阻塞在每个任务的结果上。
+
+    Args:
+        tasks: 已投递到执行器的任务列表
+        timeout: 超时时间（秒）
+
+    Returns:
+        bool: 是否在超时前全部结束
+    """
+    done = threading.Event()
+    lock = threading.Lock()
+    remaining = len(tasks)
+    if not remaining:
+        return True
+
+    def on_done(_future):
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            if remaining == 0:
+                done.set()
+
+    for task in tasks:
+        task.future.add_done_callback(on_done)
+    return done.wait(timeout)
+
+
+@pytest.fixture
+def wait_done():
+    """等待一组任务全部结束的辅助函数"""
+    return _wait_done
+
+
+def _load_json(response) -> dict:
+    """解析响应体JSON"""
+    return orjson.loads(response.data)
+
+
+@pytest.fixture(scope='class')
+def api_client(request):
+    """
+    同一测试类共享的Flask测试客户端
+
+    用于unittest.TestCase子类时同时设置为类属性client。
+    """
+    # 按需导入，只运行线程池测试时不创建Web应用
+    from app import app
+
+    client = app.test_client()
+    client.testing = True
+    if request.cls is not None:
+        request.cls.client = client
+    return client
+
+
+@pytest.fixture(scope='class')
+def load_json(request):
+    """
+    解析响应体JSON的辅助函数
+
+    用于unittest.TestCase子类时同时设置为类属性load_json。
+    """
+    if request.cls is not None:
+        request.cls.load_json = staticmethod(_load_json)
+    return _load_json
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Web API单元测试
+"""
+import datetime
+import os
+import tempfile
+import time
+import threading
+import unittest
+import uuid
+from unittest import mock
+
+import orjson
+import pytest
+
+import app as app_module
+from app import app, pool_manager
+
+
+@pytest.mark.usefixtures('api_client', 'load_json')
+class TestClosePoolAPI(unittest.TestCase):
+    """测试后台关闭线程池接口"""
+
+    def setUp(self):
+        """每个测试创建一个独立命名的线程池，并提交一个阻塞任务"""
+        self.pool_id = pool_manager.create_pool(f"close_api_{uuid.uuid4().hex}", 1)
+        self.release = threading.Event()
+        pool_manager.submit_task(self.pool_id, self.release.wait, None, 5)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.release.set()
+        pool_manager.force_close_pool(self.pool_id)
+
+    def _wait_close_status(self, expected: str) -> dict:
+        """轮询关闭进度直到进入期望状态"""
+        deadline = time.time() + 5
+        while True:
+            data = self.load_json(self.client.get(f'/api/pools/{self.pool_id}/close-status'))
+            if data['data']['status'] == expected or time.time() > deadline:
+                return data
+            time.sleep(0.01)
+
+    def test_close_pool(self):
+        """测试关闭进度从closing变为closed，关闭后再次关闭返回404"""
+        response = self.client.delete(f'/api/pools/{self.pool_id}')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.load_json(response), {'success': True, 'status': 'closing'})
+
+        data = self.load_json(self.client.get(f'/api/pools/{self.pool_id}/close-status'))
+        self.assertEqual(data['data'], {'pool_id': self.pool_id, 'status': 'closing'})
+
+        # 关闭进行中重复请求仍返回202
+        self.assertEqual(self.client.delete(f'/api/pools/{self.pool_id}').status_code, 202)
+
+        self.release.set()
+        data = self._wait_close_status('closed')
+        self.assertEqual(data['data']['status'], 'closed')
+
+        # 已关闭的线程池不再存在
+        self.assertEqual(self.client.delete(f'/api/pools/{self.pool_id}').status_code, 404)
+
+    def test_close_pool_failed_can_retry(self):
+        """测试关闭失败后状态为failed，且可以重新关闭"""
+        self.release.set()
+        with mock.patch.object(pool_manager, 'close_pool', return_value=False):
+            response = self.client.delete(f'/api/pools/{self.pool_id}')
+            self.assertEqual(response.status_code, 202)
+            data = self._wait_close_status('failed')
+        self.assertEqual(data['data']['status'], 'failed')
+
+        # 线程池仍然存在，可以重新发起关闭
+        response = self.client.delete(f'/api/pools/{self.pool_id}')
+        self.assertEqual(response.status_code, 202)
+        data = self._wait_close_status('closed')
+        self.assertEqual(data['data']['status'], 'closed')
+
+    def test_close_nonexistent_pool(self):
+        """测试关闭不存在的线程池"""
+        self.assertEqual(self.client.delete('/api/pools/nonexistent').status_code, 404)
+        self.assertEqual(self.client.get('/api/pools/nonexistent/close-status').status_code, 404)
+
+
+@pytest.mark.usefixtures('api_client', 'load_json')
+class TestETagAPI(unittest.TestCase):
+    """测试线程池列表和统计接口的ETag条件请求"""
+
+    def setUp(self):
+        """每个测试创建一个独立命名的线程池"""
+        self.pool_id = pool_manager.create_pool(f"etag_api_{uuid.uuid4().hex}", 1)
+
+    def tearDown(self):
+        """测试后清理"""
+        pool_manager.force_close_pool(self.pool_id)
+
+    def _check_etag(self, url: str):
+        """检查ETag响应头、匹配时返回304、状态变化后返回新的ETag"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers.get('ETag')
+        self.assertTrue(etag)
+        self.assertTrue(self.load_json(response)['success'])
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers.get('ETag'), etag)
+
+        # 提交任务后状态版本变化，旧的ETag不再匹配
+        task = pool_manager.submit_task_obj(self.pool_id, lambda: None)
+        task.get_result(timeout=5)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers.get('ETag'), etag)
+
+    def test_list_pools_etag(self):
+        """测试线程池列表的ETag"""
+        self._check_etag('/api/pools')
+
+    def test_stats_etag(self):
+        """测试统计信息的ETag"""
+        self._check_etag('/api/stats')
+
+
+@pytest.mark.usefixtures('api_client', 'load_json')
+class TestRequestBodyAPI(unittest.TestCase):
+    """测试请求体大小限制和orjson请求解析"""
+
+    def test_oversized_body(self):
+        """测试超过MAX_CONTENT_LENGTH的请求体被直接拒绝"""
+        body = b'x' * (app.config['MAX_CONTENT_LENGTH'] + 1)
+        requests = [
+            (self.client.post, '/api/pools'),
+            (self.client.post, '/api/tasks'),
+            (self.client.put, '/api/pools/any/resize'),
+        ]
+        for send, url in requests:
+            with self.subTest(url=url):
+                with mock.patch.object(app.json, 'loads', wraps=app.json.loads) as loads:
+                    response = send(url, data=body, content_type='application/json')
+                self.assertEqual(response.status_code, 413)
+                self.assertEqual(self.load_json(response), {'success': False, 'error': 'Request body too large'})
+                # 超限的请求体不会进入JSON解析
+                loads.assert_not_called()
+
+    def test_request_body_parsed_by_provider(self):
+        """测试正常和非法的JSON请求体都经由orjson实现解析"""
+        name = f"body_api_{uuid.uuid4().hex}"
+        with mock.patch.object(app.json, 'loads', wraps=app.json.loads) as loads:
+            response = self.client.post(
+                '/api/pools', data=orjson.dumps({'name': name, 'max_workers': 2}),
+                content_type='application/json'
+            )
+            self.assertEqual(loads.call_count, 1)
+            data = self.load_json(response)
+            self.assertTrue(data['success'])
+            self.addCleanup(pool_manager.force_close_pool, data['data']['pool_id'])
+            self.assertEqual(data['data']['name'], name)
+
+            response = self.client.post('/api/pools', data=b'{invalid', content_type='application/json')
+            self.assertEqual(loads.call_count, 2)
+        self.assertGreaterEqual(response.status_code, 400)
+        self.assertFalse(self.load_json(response)['success'])
+
+
+class TestJSONProvider(unittest.TestCase):
+    """测试orjson实现的JSON序列化"""
+
+    def test_sort_keys(self):
+        """测试默认按键排序，与Flask默认实现一致，并支持sort_keys参数"""
+        obj = {'b': 1, 'a': {'d': 2, 'c': 3}}
+        with app.app_context():
+            self.assertEqual(app.json.response(obj).get_data(), b'{"a":{"c":3,"d":2},"b":1}')
+            self.assertEqual(app.json.dumps(obj), '{"a":{"c":3,"d":2},"b":1}')
+            self.assertEqual(app.json.dumps(obj, sort_keys=False), '{"b":1,"a":{"d":2,"c":3}}')
+
+
+class TestLoadConfig(unittest.TestCase):
+    """测试配置文件解析结果的缓存"""
+
+    def setUp(self):
+        """在临时目录中准备配置文件"""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        self.config_path = os.path.join(self.tmp_dir, 'custom-conf.yml')
+
+    def _write_config(self, text: str, mtime_ns: int):
+        """写入配置文件并设置mtime"""
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.utime(self.config_path, ns=(mtime_ns, mtime_ns))
+
+    def test_warm_start_reads_cache(self):
+        """测试热启动读取缓存，结果与冷启动一致"""
+        self._write_config("flask:\n  port: 5000\n  debug: false\n", 1_000_000_000)
+        cold = app_module.load_config(self.config_path)
+
+        with mock.patch.object(app_module.yaml, 'load') as yaml_load:
+            warm = app_module.load_config(self.config_path)
+        yaml_load.assert_not_called()
+        self.assertEqual(warm, cold)
+        self.assertEqual(cold, {'flask': {'port': 5000, 'debug': False}})
+
+    def test_modified_config_replaces_cache(self):
+        """测试配置修改后重新解析，并覆盖旧的缓存文件"""
+        self._write_config("flask:\n  port: 5000\n", 1_000_000_000)
+        app_module.load_config(self.config_path)
+        self._write_config("flask:\n  port: 6000\n", 2_000_000_000)
+
+        self.assertEqual(app_module.load_config(self.config_path), {'flask': {'port': 6000}})
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ['custom-conf.yml', 'custom-conf.yml.cache.json'])
+
+    def test_failed_cache_write_keeps_existing_cache(self):
+        """测试缓存写入失败时只删除自己的临时文件，不删除已有的缓存"""
+        self._write_config("flask:\n  port: 5000\n", 1_000_000_000)
+        app_module.load_config(self.config_path)
+        self._write_config("flask:\n  port: 6000\n", 2_000_000_000)
+
+        with mock.patch.object(app_module.os, 'replace', side_effect=OSError("busy")):
+            self.assertEqual(app_module.load_config(self.config_path), {'flask': {'port': 6000}})
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ['custom-conf.yml', 'custom-conf.yml.cache.json'])
+
+    def test_non_json_config_not_cached(self):
+        """测试非字符串键和日期等无法无损缓存的配置，热启动结果与冷启动一致"""
+        self._write_config("codes:\n  404: missing\nreleased: 2024-01-01\n", 1_000_000_000)
+        cold = app_module.load_config(self.config_path)
+        warm = app_module.load_config(self.config_path)
+
+        self.assertEqual(cold, {'codes': {404: 'missing'}, 'released': datetime.date(2024, 1, 1)})
+        self.assertEqual(warm, cold)
+        self.assertEqual(os.listdir(self.tmp_dir), ['custom-conf.yml'])
@@ -3,54 +3,93 @@
 动态调整线程池大小的单元测试
 """
 
-import unittest
+import pytest
 import time
+import uuid
 import threading
-from concurrent.futures import wait
+from concurrent.futures import ALL_COMPLETED, ThreadPoolExecutor, wait
 
 from src.threadpool_manager import ThreadPoolManager
 from src.threadpool_manager.managed_pool import ManagedThreadPool
 from src.threadpool_manager.enums import TaskStatus, PoolStatus
 
 
-class TestDynamicResize(unittest.TestCase):
+class TestDynamicResize:
     """测试动态调整线程池大小功能"""
     
-    def setUp(self):
+    @classmethod
+    def setup_class(cls):
+        """所有测试共享一个管理器和发起并发请求的辅助线程池"""
+        cls.manager = ThreadPoolManager()
+        cls.helper_pool = ThreadPoolExecutor(max_workers=4)
+    
+    @classmethod
+    def teardown_class(cls):
+        """关闭共享的管理器和辅助线程池"""
+        cls.helper_pool.shutdown()
+        cls.manager.shutdown()
+    
+    def setup_method(self):
         """测试前置设置"""
-        self.manager = ThreadPoolManager()
-        self.pool_id = self.manager.create_pool("test_resize", 2)
+        # 每个测试使用独立命名的线程池，互不影响
+        self.pool_id = self.manager.create_pool(f"test_resize_{uuid.uuid4().hex}", 2)
+        # 阻塞任务等待该事件，由测试显式放行
+        self.release = threading.Event()
+        # 每个开始运行的阻塞任务释放一次
+        self.started = threading.Semaphore(0)
     
-    def tearDown(self):
+    def teardown_method(self):
         """测试后清理"""
-        try:
-            self.manager.force_close_pool(self.pool_id)
-        except:
-            pass
+        self.release.set()
+        self.manager.force_close_pool(self.pool_id)
+    
+    def _blocker(self, started: threading.Event = None):
+        """保持运行状态直到测试放行的任务"""
+        self.started.release()
+        if started is not None:
+            started.set()
+        self.release.wait(timeout=5)
+    
+    def _expected_migrated(self, submitted: int, workers: int) -> int:
+        """
+        等待工作线程取走任务，返回调整大小时仍在排队、会被迁移的任务数
+        
+        调整大小只迁移尚未开始的任务，已在工作线程中运行的任务留在老执行器中。
+        """
+        running = min(submitted, workers)
+        for _ in range(running):
+            assert self.started.acquire(timeout=5)
+        return submitted - running
+    
+    def _wait_tasks(self, task_ids):
+        """放行阻塞任务并等待全部完成"""
+        self.release.set()
+        futures = [self.manager.get_task(task_id).future for task_id in task_ids]
+        _, not_done = wait(futures, timeout=5, return_when=ALL_COMPLETED)
+        assert not not_done
     
     def test_basic_resize_increase(self):
         """测试基本的大小增加"""
         # 提交一些任务
         task_ids = []
         for i in range(3):
-            task_id = self.manager.submit_task(
-                self.pool_id, 
-                lambda x: time.sleep(x), 
-                f"task-{i}", 
-                0.1
-            )
+            task_id = self.manager.submit_task(self.pool_id, self._blocker, f"task-{i}")
             task_ids.append(task_id)
         
+        expected_migrated = self._expected_migrated(3, 2)
+        
         # 增加线程池大小
         result = self.manager.resize_pool(self.pool_id, 5)
         
-        self.assertTrue(result['success'])
-        self.assertEqual(result['migrated_tasks'], 3)
-        self.assertIn('成功调整线程池', result['message'])
+        assert result['success']
+        assert result['migrated_tasks'] == expected_migrated
+        assert '成功调整线程池' in result['message']
+        assert '大小从 2 到 5' in result['message']
         
         # 验证新的大小
-        pool_info = self.manager.get_pool_info(self.pool_id)
-        self.assertEqual(pool_info['max_workers'], 5)
+        pool_info = self.manager.get_pool(self.pool_id).get_info()
+        assert pool_info['max_workers'] == 5
+        self._wait_tasks(task_ids)
     
     def test_basic_resize_decrease(self):
         """测试基本的大小减少"""
@@ -60,89 +99,89 @@ class TestDynamicResize(unittest.TestCase):
         # 提交一些任务
         task_ids = []
         for i in range(3):
-            task_id = self.manager.submit_task(
-                self.pool_id, 
-                lambda x: time.sleep(x), 
-                f"task-{i}", 
-                0.1
-            )
+            task_id = self.manager.submit_task(self.pool_id, self._blocker, f"task-{i}")
             task_ids.append(task_id)
         
+        expected_migrated = self._expected_migrated(3, 5)
+        
         # 减少线程池大小
         result = self.manager.resize_pool(self.pool_id, 2)
         
-        self.assertTrue(result['success'])
-        self.assertEqual(result['migrated_tasks'], 3)
+        assert result['success']
+        assert result['migrated_tasks'] == expected_migrated
         
         # 验证新的大小
-        pool_info = self.manager.get_pool_info(self.pool_id)
-        self.assertEqual(pool_info['max_workers'], 2)
-    
-    def test_resize_same_size(self):
-        """测试调整到相同大小"""
-        result = self.manager.resize_pool(self.pool_id, 2)
-        
-        self.assertTrue(result['success'])
-        self.assertIn('已经是', result['message'])
+        pool_info = self.manager.get_pool(self.pool_id).get_info()
+        assert pool_info['max_workers'] == 2
+        self._wait_tasks(task_ids)
     
-    def test_resize_invalid_size(self):
-        """测试无效的线程池大小"""
-        result = self.manager.resize_pool(self.pool_id, 0)
+    @pytest.mark.parametrize("new_size, expected_success, message_fragment, expected_workers", [
+        (5, True, '成功调整线程池', 5),  # 空闲线程池扩容
+        (2, True, '已经是', 2),  # 调整到相同大小
+        (0, False, '必须大于等于', 2),  # 无效的线程池大小
+    ])
+    def test_resize(self, new_size, expected_success, message_fragment, expected_workers):
+        """测试调整空闲线程池大小的结果"""
+        result = self.manager.resize_pool(self.pool_id, new_size)
         
-        self.assertFalse(result['success'])
-        self.assertIn('必须大于等于', result['message'])
+        assert result['success'] is expected_success
+        assert message_fragment in result['message']
+        assert self.manager.get_pool(self.pool_id).max_workers == expected_workers
     
     def test_resize_nonexistent_pool(self):
         """测试调整不存在的线程池"""
-        with self.assertRaises(KeyError):
+        with pytest.raises(KeyError):
             self.manager.resize_pool("nonexistent", 5)
     
     def test_resize_with_running_tasks(self):
         """测试调整时有运行中任务"""
         # 提交长时间运行的任务
         task_ids = []
+        started = [threading.Event() for _ in range(2)]
         for i in range(2):
             task_id = self.manager.submit_task(
                 self.pool_id, 
-                lambda x: time.sleep(x), 
+                self._blocker, 
                 f"long-task-{i}", 
-                2
+                started[i]
             )
             task_ids.append(task_id)
         
         # 等待任务开始执行
-        time.sleep(0.5)
+        for event in started:
+            assert event.wait(timeout=5)
         
         # 调整线程池大小
         result = self.manager.resize_pool(self.pool_id, 3)
         
-        self.assertTrue(result['success'])
-        self.assertEqual(result['running_tasks'], 2)  # 有2个运行中任务
+        assert result['success']
+        assert result['running_tasks'] == 2  # 有2个运行中任务
         
-        # 等待任务完成
-        for task_id in task_ids:
-            task = self.manager.get_task(task_id)
-            if task:
-                task.future.result(timeout=3)
+        # 放行并等待任务完成
+        self._wait_tasks(task_ids)
     
     def test_resize_info(self):
         """测试获取调整信息"""
         info = self.manager.get_pool_resize_info(self.pool_id)
         
-        self.assertEqual(info['pool_id'], self.pool_id)
-        self.assertEqual(info['current_max_workers'], 2)
-        self.assertTrue(info['can_resize'])
-        self.assertEqual(info['status'], 'running')
+        assert info['pool_id'] == self.pool_id
+        assert info['current_max_workers'] == 2
+        assert info['can_resize']
+        assert info['status'] == 'running'
     
     def test_resize_closed_pool(self):
         """测试调整已关闭的线程池"""
+        # close_pool会把线程池移出管理器，先持有线程池对象
+        pool = self.manager.get_pool(self.pool_id)
         self.manager.close_pool(self.pool_id)
         
-        pool = self.manager.get_pool(self.pool_id)
         result = pool.resize(5)
         
-        self.assertFalse(result['success'])
-        self.assertIn('当前状态为', result['message'])
+        assert not result['success']
+        assert '当前状态为' in result['message']
+        # 管理器中已不存在该线程池
+        with pytest.raises(KeyError):
+            self.manager.resize_pool(self.pool_id, 5)
     
     def test_task_migration_preserves_task_id(self):
         """测试任务迁移时保持任务ID不变"""
@@ -158,71 +197,54 @@ class TestDynamicResize(unittest.TestCase):
         
         # 验证任务ID仍然存在
         task = self.manager.get_task(task_id)
-        self.assertIsNotNone(task)
-        self.assertEqual(task.task_id, task_id)
-        self.assertEqual(task.name, "test-task")
+        assert task is not None
+        assert task.task_id == task_id
+        assert task.name == "test-task"
     
     def test_concurrent_resize_requests(self):
         """测试并发调整请求"""
-        results = []
-        
         def resize_worker(new_size):
             try:
-                result = self.manager.resize_pool(self.pool_id, new_size)
-                results.append(result)
+                return self.manager.resize_pool(self.pool_id, new_size)
             except Exception as e:
-                results.append({'success': False, 'error': str(e)})
+                return {'success': False, 'error': str(e)}
         
-        # 启动多个并发调整请求
-        threads = []
-        for size in [3, 4, 5]:
-            thread = threading.Thread(target=resize_worker, args=(size,))
-            threads.append(thread)
-            thread.start()
-        
-        # 等待所有线程完成
-        for thread in threads:
-            thread.join()
+        # 在辅助线程池中并发发起多个调整请求
+        results = list(self.helper_pool.map(resize_worker, [3, 4, 5]))
         
         # 至少有一个请求应该成功
         success_count = sum(1 for r in results if r.get('success', False))
-        self.assertGreaterEqual(success_count, 1)
+        assert success_count >= 1
     
     def test_resize_with_large_task_queue(self):
         """测试有大量任务时的调整"""
         # 提交大量任务
-        task_ids = []
-        for i in range(50):
-            task_id = self.manager.submit_task(
-                self.pool_id, 
-                lambda x: time.sleep(x), 
-                f"batch-task-{i}", 
-                0.01
-            )
-            task_ids.append(task_id)
+        blocker = self._blocker
+        jobs = [(blocker, f"batch-task-{i}", (), None) for i in range(50)]
+        task_ids = self.manager.submit_many(self.pool_id, jobs)
+        expected_migrated = self._expected_migrated(50, 2)
         
         # 调整线程池大小
         result = self.manager.resize_pool(self.pool_id, 10)
         
-        self.assertTrue(result['success'])
-        self.assertEqual(result['migrated_tasks'], 50)
+        assert result['success']
+        assert result['migrated_tasks'] == expected_migrated
         
-        # 等待所有任务完成
-        for task_id in task_ids:
-            task = self.manager.get_task(task_id)
-            if task and task.future:
-                task.future.result(timeout=5)
+        # 放行并等待所有任务完成
+        self._wait_tasks(task_ids)
 
 
-class TestManagedPoolResize(unittest.TestCase):
+class TestManagedPoolResize:
     """测试ManagedThreadPool的resize方法"""
     
-    def setUp(self):
+    def setup_method(self):
         """测试前置设置"""
         self.pool = ManagedThreadPool("test-pool", "Test Pool", 2)
+        self.release = threading.Event()
     
-    def tearDown(self):
+    def teardown_method(self):
         """测试后清理"""
+        self.release.set()
         try:
             self.pool.shutdown()
         except:
@@ -230,20 +252,86 @@ class TestManagedPoolResize(unittest.TestCase):
     
     def test_managed_pool_resize(self):
         """测试ManagedThreadPool的resize方法"""
-        # 提交任务
-        task_id = self.pool.submit(lambda: time.sleep(0.1), "test-task")
+        # 先占满两个工作线程，使被观察的任务在调整大小时仍在排队
+        started = threading.Semaphore(0)
+        
+        def blocker():
+            started.release()
+            self.release.wait(timeout=5)
+        
+        self.pool.submit(blocker)
+        self.pool.submit(blocker)
+        task_id = self.pool.submit(blocker, "test-task")
+        for _ in range(2):
+            assert started.acquire(timeout=5)
         
         # 调整大小
         result = self.pool.resize(5)
         
-        self.assertTrue(result['success'])
-        self.assertEqual(result['migrated_tasks'], 1)
+        assert result['success']
+        assert result['migrated_tasks'] == 1
+        assert result['running_tasks'] == 2
         
         # 验证任务仍然存在
         task = self.pool.get_task(task_id)
-        self.assertIsNotNone(task)
-        self.assertEqual(task.task_id, task_id)
+        assert task is not None
+        assert task.task_id == task_id
 
+    def test_resize_runs_migrated_tasks_once(self):
+        """测试迁移的任务不会在新老执行器中各执行一次"""
+        run_counts = {}
+        lock = threading.Lock()
+        
+        def job(i):
+            with lock:
+                run_counts[i] = run_counts.get(i, 0) + 1
+            time.sleep(0.01)
+        
+        for i in range(20):
+            self.pool.submit(job, f"job-{i}", i)
+        self.pool.resize(4)
+        self.pool.shutdown(wait=True)
+        time.sleep(0.1)  # 等待老执行器中运行的任务结束
+        
+        assert len(run_counts) == 20
+        assert set(run_counts.values()) == {1}
 
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    def test_cancel_task_during_resize(self):
+        """测试调整大小期间被取消的待执行任务不会在新执行器中运行"""
+        started = threading.Event()
+        ran = threading.Event()
+        # 构造线程池时也会创建执行器，只在调整大小时取消这里记录的任务
+        to_cancel = []
+        
+        class CancellingPool(ManagedThreadPool):
+            """在任务分类之后、迁移之前取消被观察的任务"""
+            __slots__ = ()
+            
+            def _create_executor(self, max_workers):
+                for task_id in to_cancel:
+                    assert self.cancel_task(task_id)
+                return super()._create_executor(max_workers)
+        
+        pool = CancellingPool("cancel-pool", "Cancel Pool", 1)
+        try:
+            pool.submit(self._blocker_until_released, "blocker", started)
+            task_id = pool.submit(ran.set, "cancelled-task")
+            assert started.wait(timeout=5)
+            to_cancel.append(task_id)
+            
+            result = pool.resize(2)
+            
+            assert result['success']
+            assert result['migrated_tasks'] == 0
+            task = pool.get_task(task_id)
+            assert task.status is TaskStatus.CANCELLED
+            assert task.future.cancelled()
+        finally:
+            self.release.set()
+            pool.shutdown(wait=True)
+        assert not ran.is_set()
+    
+    def _blocker_until_released(self, started: threading.Event):
+        """通知已开始运行，并保持运行直到测试放行"""
+        started.set()
+        self.release.wait(timeout=5)
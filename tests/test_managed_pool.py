@@ -3,9 +3,12 @@
 """
 
 import pytest
-import time
+import threading
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from src.threadpool_manager import ManagedThreadPool
 from src.threadpool_manager.exceptions import InvalidPoolStateError
+from src.threadpool_manager.sharded_executor import ShardedExecutor
 
 
 class TestManagedThreadPool:
@@ -14,12 +17,20 @@ class TestManagedThreadPool:
     def setup_method(self):
         """每个测试方法前的设置"""
         self.pool = ManagedThreadPool("test_pool_id", "test_pool", 2)
+        # 阻塞任务等待该事件，由测试显式放行
+        self.release = threading.Event()
     
     def teardown_method(self):
         """每个测试方法后的清理"""
+        self.release.set()
         if self.pool.get_status().value == 'running':
             self.pool.shutdown()
     
+    def _waiter(self):
+        """保持运行状态直到测试放行的任务"""
+        self.release.wait(timeout=5)
+        return "done"
+    
     def test_init(self):
         """测试初始化"""
         assert self.pool.pool_id == "test_pool_id"
@@ -33,7 +44,27 @@ class TestManagedThreadPool:
         
         task_id = self.pool.submit(test_func, "test_task", 5)
         assert task_id is not None
-        assert len(self.pool.list_tasks()) == 1
+        assert self.pool.task_count == 1
+    
+    def test_submit_many(self, wait_done):
+        """测试批量提交任务"""
+        double = lambda x: x * 2
+        names = [f"batch_{i}" for i in range(5)]
+        jobs = [(double, name, (i,), None) for i, name in enumerate(names)]
+        task_ids = self.pool.submit_many(jobs)
+        
+        assert len(task_ids) == 5
+        tasks = [self.pool.get_task(task_id) for task_id in task_ids]
+        assert wait_done(tasks)
+        assert [task.result for task in tasks] == [0, 2, 4, 6, 8]
+        assert [task.name for task in tasks] == names
+    
+    def test_submit_many_to_closed_pool(self):
+        """测试向已关闭的线程池批量提交任务"""
+        self.pool.shutdown()
+        with pytest.raises(InvalidPoolStateError):
+            self.pool.submit_many([(lambda: None, None, (), None)])
+        assert self.pool.get_info()['total_tasks'] == 0
     
     def test_submit_task_to_closed_pool(self):
         """测试向已关闭的线程池提交任务"""
@@ -62,13 +93,21 @@ class TestManagedThreadPool:
         tasks = self.pool.list_tasks()
         assert len(tasks) == 2
     
+    def test_list_tasks_page(self):
+        """测试分页列出任务"""
+        def test_func():
+            return "test"
+        
+        for i in range(5):
+            self.pool.submit(test_func, f"task{i}")
+        
+        total, tasks = self.pool.list_tasks_page(offset=2, limit=2)
+        assert total == 5
+        assert [task['name'] for task in tasks] == ["task2", "task3"]
+    
     def test_cancel_task(self):
         """测试取消任务"""
-        def long_task():
-            time.sleep(10)
-            return "done"
-        
-        task_id = self.pool.submit(long_task)
+        task_id = self.pool.submit(self._waiter)
         success = self.pool.cancel_task(task_id)
         # 任务可能已经开始执行，取消可能成功也可能失败
         assert success in [True, False]
@@ -80,15 +119,11 @@ class TestManagedThreadPool:
     
     def test_shutdown_now(self):
         """测试立即关闭"""
-        def long_task():
-            time.sleep(10)
-            return "done"
-        
-        self.pool.submit(long_task)
+        self.pool.submit(self._waiter)
         cancelled_tasks = self.pool.shutdown_now()
         assert len(cancelled_tasks) == 1
     
-    def test_cleanup_completed_tasks(self):
+    def test_cleanup_completed_tasks(self, wait_done):
         """测试清理已完成的任务"""
         def quick_task():
             return "done"
@@ -96,13 +131,24 @@ class TestManagedThreadPool:
         task_id = self.pool.submit(quick_task)
         
         # 等待任务完成
-        task = self.pool.get_task(task_id)
-        task.get_result(timeout=5)
+        assert wait_done([self.pool.get_task(task_id)])
         
         # 清理已完成的任务
         cleaned = self.pool.cleanup_completed_tasks()
         assert cleaned == 1
-        assert len(self.pool.list_tasks()) == 0
+        assert self.pool.task_count == 0
+    
+    def test_task_history_limit(self):
+        """测试已完成任务的保留上限"""
+        pool = ManagedThreadPool("history_pool_id", "history_pool", 1, max_task_history=3)
+        done = lambda: "done"
+        for i in range(5):
+            pool.submit(done, f"task{i}")
+        pool.shutdown(wait=True)
+        
+        # 只保留最近完成的3个任务
+        assert [task['name'] for task in pool.list_tasks()] == ["task2", "task3", "task4"]
+        assert pool.get_info()['completed_tasks'] == 3
     
     def test_get_info(self):
         """测试获取线程池信息"""
@@ -111,6 +157,67 @@ class TestManagedThreadPool:
         assert info['name'] == "test_pool"
         assert info['max_workers'] == 2
     
+    def test_get_info_status_counts(self):
+        """测试状态计数与任务实际状态一致"""
+        pool = ManagedThreadPool("count_pool_id", "count_pool", 1)
+        release = threading.Event()
+        pool.submit(release.wait, "blocker")
+        pool.submit(lambda: 1 / 0, "failing")
+        pool.submit(lambda: "done", "to_cancel")
+        pool.submit(lambda: "done", "quick")
+        tasks = {task.name: task for task in pool.tasks.values()}
+        assert tasks["to_cancel"].cancel() is True
+        
+        info = pool.get_info()
+        assert info['total_tasks'] == 4
+        assert info['active_tasks'] == 3
+        assert info['cancelled_tasks'] == 1
+        
+        release.set()
+        pool.shutdown(wait=True)
+        info = pool.get_info()
+        assert info['total_tasks'] == 4
+        assert info['active_tasks'] == 0
+        assert info['completed_tasks'] == 4
+        assert info['failed_tasks'] == 1
+        assert info['cancelled_tasks'] == 1
+    
+    def test_get_info_bytes(self):
+        """测试序列化的线程池信息与get_info一致"""
+        assert orjson.loads(self.pool.get_info_bytes()) == self.pool.get_info()
+        
+        # 调整大小后不变字段需要重新序列化
+        self.pool.resize(3)
+        assert orjson.loads(self.pool.get_info_bytes())['max_workers'] == 3
+    
+    @pytest.mark.parametrize("max_workers, executor_cls", [
+        (ManagedThreadPool.SHARDED_EXECUTOR_MIN_WORKERS - 1, ThreadPoolExecutor),
+        (ManagedThreadPool.SHARDED_EXECUTOR_MIN_WORKERS, ShardedExecutor),
+        (ManagedThreadPool.SHARDED_EXECUTOR_MAX_WORKERS, ShardedExecutor),
+        (ManagedThreadPool.SHARDED_EXECUTOR_MAX_WORKERS + 1, ThreadPoolExecutor),
+    ])
+    def test_executor_selection(self, max_workers, executor_cls):
+        """测试按工作线程数选择执行器实现"""
+        pool = ManagedThreadPool("sized_pool_id", "sized_pool", max_workers)
+        try:
+            assert type(pool.executor) is executor_cls
+            assert pool.submit_task_obj(lambda: "ok").get_result(timeout=5) == "ok"
+        finally:
+            pool.shutdown()
+    
+    def test_executor_selection_on_resize(self):
+        """测试调整大小时按新的工作线程数重新选择执行器"""
+        pool = ManagedThreadPool("resize_pool_id", "resize_pool",
+                                 ManagedThreadPool.SHARDED_EXECUTOR_MIN_WORKERS - 1)
+        try:
+            assert type(pool.executor) is ThreadPoolExecutor
+            pool.resize(ManagedThreadPool.SHARDED_EXECUTOR_MIN_WORKERS)
+            assert type(pool.executor) is ShardedExecutor
+            pool.resize(ManagedThreadPool.SHARDED_EXECUTOR_MAX_WORKERS + 1)
+            assert type(pool.executor) is ThreadPoolExecutor
+        finally:
+            pool.shutdown()
+    
     def test_context_manager(self):
         """测试上下文管理器"""
         with ManagedThreadPool("ctx_pool_id", "ctx_pool", 2) as pool:
@@ -120,50 +227,46 @@ class TestManagedThreadPool:
         # 上下文退出后线程池应已关闭
         # 注意：这里不能直接测试状态，因为对象已关闭
     
-    def test_task_execution(self):
+    def test_task_execution(self, wait_done):
         """测试任务执行"""
         def add_func(x, y):
             return x + y
         
-        task_id = self.pool.submit(add_func, "add_task", 3, 4)
-        task = self.pool.get_task(task_id)
-        result = task.get_result(timeout=5)
+        task = self.pool.submit_task_obj(add_func, "add_task", 3, 4)
+        assert self.pool.get_task(task.task_id) is task
+        assert wait_done([task])
         
-        assert result == 7
+        assert task.get_status().value == 'completed'
+        assert task.result == 7
     
-    def test_get_active_tasks(self):
+    def test_get_active_tasks(self, wait_done):
         """测试获取活跃任务"""
         def quick_task():
             return "done"
         
-        def long_task():
-            time.sleep(5)
-            return "done"
-        
         task1_id = self.pool.submit(quick_task)
-        task2_id = self.pool.submit(long_task)
+        task2_id = self.pool.submit(self._waiter)
         
         # 等待第一个任务完成
-        task1 = self.pool.get_task(task1_id)
-        task1.get_result(timeout=2)
+        assert wait_done([self.pool.get_task(task1_id)])
         
         active_tasks = self.pool.get_active_tasks()
         assert len(active_tasks) == 1  # 只有第二个任务还在运行
     
-    def test_task_status_tracking(self):
+    def test_task_status_tracking(self, wait_done):
         """测试任务状态跟踪"""
-        def test_func():
-            time.sleep(0.1)
-            return "done"
-        
-        task_id = self.pool.submit(test_func)
+        # 先占满两个工作线程，使被观察的任务停留在pending状态
+        self.pool.submit(self._waiter)
+        self.pool.submit(self._waiter)
+        task_id = self.pool.submit(lambda: "done")
         task = self.pool.get_task(task_id)
         
         # 初始状态应该是pending
         assert task.get_status().value == 'pending'
         
-        # 等待任务完成
-        task.get_result(timeout=5)
+        # 放行并等待任务完成
+        self.release.set()
+        assert wait_done([task])
         
         # 完成后状态应该是completed
         assert task.get_status().value == 'completed'
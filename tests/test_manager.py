@@ -4,6 +4,7 @@
 
 import pytest
 import time
+import threading
 from unittest.mock import Mock
 
 from src.threadpool_manager import ThreadPoolManager
@@ -29,7 +30,7 @@ class TestThreadPoolManager:
         """测试创建线程池"""
         pool_id = self.manager.create_pool("test_pool", 3)
         assert pool_id is not None
-        assert len(self.manager.list_pools()) == 1
+        assert self.manager.count_pools() == 1
     
     def test_create_pool_duplicate_name(self):
         """测试创建同名线程池"""
@@ -37,6 +38,16 @@ class TestThreadPoolManager:
         with pytest.raises(PoolAlreadyExistsError):
             self.manager.create_pool("test_pool", 3)
     
+    def test_reuse_name_after_close(self):
+        """测试线程池关闭后可以再次使用其名称"""
+        pool_id = self.manager.create_pool("test_pool", 1)
+        self.manager.close_pool(pool_id)
+        new_id = self.manager.create_pool("test_pool", 1)
+        assert self.manager.get_pool(new_id).name == "test_pool"
+        
+        self.manager.force_close_pool(new_id)
+        self.manager.create_pool("test_pool", 1)
+    
     def test_get_pool(self):
         """测试获取线程池"""
         pool_id = self.manager.create_pool("test_pool", 3)
@@ -53,7 +64,19 @@ class TestThreadPoolManager:
         pool_id = self.manager.create_pool("test_pool", 3)
         success = self.manager.close_pool(pool_id)
         assert success is True
-        assert len(self.manager.list_pools()) == 0
+        assert self.manager.count_pools() == 0
+    
+    def test_close_pool_removes_tasks(self):
+        """测试关闭线程池时只清理该线程池的已完成任务"""
+        pool_id = self.manager.create_pool("test_pool", 3)
+        other_pool_id = self.manager.create_pool("other_pool", 1)
+        done = lambda: "done"
+        for _ in range(3):
+            self.manager.submit_task(pool_id, done)
+        other_task_id = self.manager.submit_task(other_pool_id, done)
+        
+        assert self.manager.close_pool(pool_id, wait=True) is True
+        assert list(self.manager.tasks) == [other_task_id]
     
     def test_submit_task(self):
         """测试提交任务"""
@@ -64,7 +87,36 @@ class TestThreadPoolManager:
         
         task_id = self.manager.submit_task(pool_id, test_func, "test_task", 1, 2)
         assert task_id is not None
-        assert len(self.manager.list_tasks()) == 1
+        assert self.manager.count_tasks() == 1
+    
+    def test_submit_many(self, wait_done):
+        """测试批量提交任务"""
+        pool_id = self.manager.create_pool("test_pool", 3)
+        add = lambda x, y: x + y
+        jobs = [(add, f"batch_{i}", (i, i), None) for i in range(5)]
+        
+        task_ids = self.manager.submit_many(pool_id, jobs)
+        assert len(task_ids) == 5
+        assert self.manager.count_tasks(pool_id) == 5
+        tasks = [self.manager.get_task(task_id) for task_id in task_ids]
+        assert wait_done(tasks)
+        assert [task.result for task in tasks] == [0, 2, 4, 6, 8]
+    
+    def test_submit_many_beyond_task_history(self, wait_done):
+        """测试批量提交的任务即使已被线程池按历史上限淘汰，也会注册到全局任务表"""
+        pool_id = self.manager.create_pool("test_pool", 2)
+        self.manager.get_pool(pool_id).max_task_history = 1
+        jobs = [(lambda i=i: i, None, (), None) for i in range(20)]
+        
+        tasks = self.manager.submit_many_obj(pool_id, jobs)
+        assert wait_done(tasks)
+        assert [self.manager.get_task(task.task_id) for task in tasks] == tasks
+        assert [task.result for task in tasks] == list(range(20))
+    
+    def test_submit_many_to_nonexistent_pool(self):
+        """测试向不存在的线程池批量提交任务"""
+        with pytest.raises(PoolNotFoundError):
+            self.manager.submit_many("nonexistent", [(lambda: None, None, (), None)])
     
     def test_submit_task_to_nonexistent_pool(self):
         """测试向不存在的线程池提交任务"""
@@ -115,6 +167,17 @@ class TestThreadPoolManager:
         pools = self.manager.list_pools()
         assert len(pools) == 2
     
+    def test_list_pools_creation_order(self):
+        """测试线程池按创建顺序列出"""
+        names = [f"pool-{c}" for c in "abcdefgh"]
+        pool_ids = [self.manager.create_pool(name, 1) for name in names]
+        assert [pool['name'] for pool in self.manager.list_pools()] == names
+        
+        # 关闭中间的线程池后其余线程池保持原有顺序
+        self.manager.close_pool(pool_ids[3])
+        del names[3]
+        assert [pool['name'] for pool in self.manager.list_pools()] == names
+    
     def test_list_tasks(self):
         """测试列出任务"""
         pool_id = self.manager.create_pool("test_pool", 3)
@@ -145,20 +208,35 @@ class TestThreadPoolManager:
         assert len(tasks1) == 1
         assert len(tasks2) == 1
     
-    def test_task_execution(self):
+    def test_count_pools_and_tasks(self):
+        """测试统计线程池和任务数量"""
+        pool1 = self.manager.create_pool("pool1", 2)
+        pool2 = self.manager.create_pool("pool2", 2)
+        self.manager.submit_many(pool1, [(lambda: None, None, (), None)] * 2)
+        self.manager.submit_task(pool2, lambda: None)
+        
+        assert self.manager.count_pools() == 2
+        assert self.manager.count_tasks() == 3
+        assert self.manager.count_tasks(pool1) == 2
+        assert self.manager.count_tasks(pool2) == 1
+        with pytest.raises(PoolNotFoundError):
+            self.manager.count_tasks("nonexistent")
+    
+    def test_task_execution(self, wait_done):
         """测试任务执行"""
         pool_id = self.manager.create_pool("test_pool", 3)
         
         def add_func(x, y):
             return x + y
         
-        task_id = self.manager.submit_task(pool_id, add_func, "add_task", 3, 4)
+        task = self.manager.submit_task_obj(pool_id, add_func, "add_task", 3, 4)
+        assert self.manager.get_task(task.task_id) is task
         
         # 等待任务完成
-        task = self.manager.get_task(task_id)
-        result = task.get_result(timeout=5)
+        assert wait_done([task])
         
-        assert result == 7
+        assert task.get_status().value == 'completed'
+        assert task.result == 7
     
     def test_force_close_pool(self):
         """测试强制关闭线程池"""
@@ -174,23 +252,47 @@ class TestThreadPoolManager:
         # 任务可能已经开始执行，被取消的任务数量可能为0或1
         assert task_id in cancelled_tasks or len(cancelled_tasks) == 0
     
-    def test_cleanup_completed_tasks(self):
+    def test_force_close_pool_idempotent(self):
+        """测试重复强制关闭和强制关闭不存在的线程池"""
+        pool_id = self.manager.create_pool("test_pool", 3)
+        self.manager.force_close_pool(pool_id)
+        
+        assert self.manager.force_close_pool(pool_id) == []
+        assert self.manager.force_close_pool("nonexistent") == []
+    
+    def test_cleanup_completed_tasks(self, wait_done):
         """测试清理已完成的任务"""
         pool_id = self.manager.create_pool("test_pool", 3)
         
         def quick_task():
             return "done"
         
-        task_id = self.manager.submit_task(pool_id, quick_task)
+        task = self.manager.submit_task_obj(pool_id, quick_task)
         
         # 等待任务完成
-        task = self.manager.get_task(task_id)
-        task.get_result(timeout=5)
+        assert wait_done([task])
         
         # 清理已完成的任务
         cleaned = self.manager.cleanup_completed_tasks()
         assert cleaned >= 1
     
+    def test_cleanup_triggered_by_completed_tasks(self):
+        """测试完成任务数达到阈值时自动触发清理"""
+        self.manager.CLEANUP_THRESHOLD = 10
+        pool_id = self.manager.create_pool("test_pool", 3)
+        
+        # 所有任务注册到管理器后再放行执行
+        release = threading.Event()
+        for _ in range(10):
+            self.manager.submit_task(pool_id, release.wait)
+        release.set()
+        
+        # 第10个任务完成后清理在后台线程中执行
+        deadline = time.time() + 5
+        while self.manager.tasks and time.time() < deadline:
+            time.sleep(0.01)
+        assert self.manager.tasks == {}
+    
     def test_get_stats(self):
         """测试获取统计信息"""
         pool_id = self.manager.create_pool("test_pool", 3)
@@ -204,6 +306,42 @@ class TestThreadPoolManager:
         assert stats['total_pools'] == 1
         assert stats['total_tasks'] == 1
 
+    
+    def test_get_version(self):
+        """测试状态版本标识随状态变化而改变"""
+        initial_version = self.manager.get_version()
+        pool_id = self.manager.create_pool("test_pool", 3)
+        pool_version = self.manager.get_version()
+        assert pool_version != initial_version
+        
+        self.manager.submit_task(pool_id, lambda: "test")
+        assert self.manager.get_version() != pool_version
+    
+    def test_concurrent_submit(self):
+        """测试多线程并发向多个线程池提交任务"""
+        pool_ids = [self.manager.create_pool(f"pool_{i}", 2) for i in range(4)]
+        
+        noop = lambda: None
+        
+        def producer(pool_id):
+            return [self.manager.submit_task(pool_id, noop) for _ in range(50)]
+        
+        threads_results = []
+        threads = [
+            threading.Thread(target=lambda pid=pool_id: threads_results.append(producer(pid)))
+            for pool_id in pool_ids * 2
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        task_ids = [task_id for result in threads_results for task_id in result]
+        assert len(set(task_ids)) == 400
+        assert len(self.manager.tasks) == 400
+        for task_id in task_ids:
+            assert self.manager.get_task(task_id).task_id == task_id
+
 
 class TestThreadPoolManagerContextManager:
     """测试上下文管理器功能"""
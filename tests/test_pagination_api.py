@@ -3,52 +3,55 @@
 分页API单元测试
 """
 import unittest
-import json
-import sys
-import os
+import orjson
+import pytest
+import uuid
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import pool_manager
+from src.threadpool_manager.managed_task import ManagedTask
 
-from app import app
 
+def _post_json(client, url: str, payload):
+    """以orjson编码的请求体发送POST请求"""
+    return client.post(url, data=orjson.dumps(payload), content_type='application/json')
+
+
+@pytest.mark.usefixtures('api_client', 'load_json')
 class TestPaginationAPI(unittest.TestCase):
+    """分页API测试"""
     
-    def setUp(self):
-        """测试前设置"""
-        self.app = app.test_client()
-        self.app.testing = True
+    def _seed_tasks(self, count: int) -> str:
+        """创建线程池并登记指定数量的待执行任务，测试结束后自动清理"""
+        pool_id = pool_manager.create_pool(f"pagination_{uuid.uuid4().hex}", 3)
+        pool = pool_manager.get_pool(pool_id)
+        noop = lambda: None
+        for i in range(count):
+            task_id = f"{pool_id}-seed-{i}"
+            pool.tasks[task_id] = ManagedTask(task_id, f'test_task_{i}', pool_id, noop)
+        
+        def cleanup():
+            pool.tasks.clear()
+            pool_manager.close_pool(pool_id)
+        self.addCleanup(cleanup)
+        return pool_id
     
     def test_pagination_parameters(self):
         """测试分页参数处理"""
         # 测试默认参数
-        response = self.app.get('/api/tasks')
-        data = json.loads(response.data)
+        response = self.client.get('/api/tasks')
+        data = self.load_json(response)
         self.assertEqual(response.status_code, 200)
         self.assertIn('pagination', data)
         self.assertIn('data', data)
     
     def test_pagination_with_page(self):
         """测试指定页码"""
-        # 创建测试数据
-        pool_data = {'name': 'test_pool', 'max_workers': 3}
-        response = self.app.post('/api/pools', json=pool_data)
-        pool_data = json.loads(response.data)
-        pool_id = pool_data['data']['pool_id']
-        
-        # 创建多个任务用于测试
-        for i in range(10):
-            task_data = {
-                'pool_id': pool_id,
-                'task_name': f'test_task_{i}',
-                'task_type': 'demo',
-                'duration': 1
-            }
-            self.app.post('/api/tasks', json=task_data)
+        # 直接向管理器中的线程池登记任务，分页接口只读取任务表，无需经由HTTP提交和执行
+        self._seed_tasks(10)
         
         # 测试分页
-        response = self.app.get('/api/tasks?page=2&per_page=5')
-        data = json.loads(response.data)
+        response = self.client.get('/api/tasks?page=2&per_page=5')
+        data = self.load_json(response)
         self.assertEqual(response.status_code, 200)
         # 如果有足够数据，页码应该是2，否则应该是1
         expected_page = 2 if data['pagination']['total_items'] >= 6 else 1
@@ -57,44 +60,70 @@ class TestPaginationAPI(unittest.TestCase):
     
     def test_pagination_bounds(self):
         """测试分页边界条件"""
-        # 测试页码过小
-        response = self.app.get('/api/tasks?page=0&per_page=10')
-        data = json.loads(response.data)
-        self.assertEqual(data['pagination']['current_page'], 1)
-        
-        # 测试每页条数过大
-        response = self.app.get('/api/tasks?page=1&per_page=200')
-        data = json.loads(response.data)
-        self.assertEqual(data['pagination']['per_page'], 100)
+        cases = [
+            # 页码过小
+            ('/api/tasks?page=0&per_page=10', 'current_page', 1),
+            # 每页条数过大
+            ('/api/tasks?page=1&per_page=200', 'per_page', 100),
+        ]
+        for url, field, expected in cases:
+            with self.subTest(url=url):
+                data = self.load_json(self.client.get(url))
+                self.assertEqual(data['pagination'][field], expected)
     
     def test_pagination_with_pool_filter(self):
         """测试线程池过滤与分页结合"""
         # 创建测试线程池
         pool_data = {'name': 'test_pool', 'max_workers': 3}
-        response = self.app.post('/api/pools', json=pool_data)
+        response = _post_json(self.client, '/api/pools', pool_data)
         self.assertEqual(response.status_code, 200)
         
         # 获取响应数据
-        response_data = json.loads(response.data)
+        response_data = self.load_json(response)
         if 'data' in response_data and 'pool_id' in response_data['data']:
             pool_id = response_data['data']['pool_id']
             
             # 测试带线程池过滤的分页
-            response = self.app.get(f'/api/tasks?pool_id={pool_id}&page=1&per_page=5')
-            data = json.loads(response.data)
+            response = self.client.get(f'/api/tasks?pool_id={pool_id}&page=1&per_page=5')
+            data = self.load_json(response)
             self.assertEqual(response.status_code, 200)
             self.assertEqual(data['pagination']['current_page'], 1)
         else:
             # 如果创建失败，测试基础分页功能
-            response = self.app.get('/api/tasks?page=1&per_page=5')
-            data = json.loads(response.data)
+            response = self.client.get('/api/tasks?page=1&per_page=5')
+            data = self.load_json(response)
             self.assertEqual(response.status_code, 200)
             self.assertEqual(data['pagination']['current_page'], 1)
     
+    def test_stream_tasks(self):
+        """测试以NDJSON格式流式返回任务，每行一个任务"""
+        pool_id = self._seed_tasks(3)
+        other_pool_id = self._seed_tasks(2)
+        
+        response = self.client.get(f'/api/tasks/stream?pool_id={pool_id}&page=1&per_page=10')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        
+        lines = response.data.splitlines()
+        tasks = [orjson.loads(line) for line in lines]
+        self.assertEqual([task['name'] for task in tasks], ['test_task_0', 'test_task_1', 'test_task_2'])
+        self.assertTrue(all(task['pool_id'] == pool_id for task in tasks))
+        
+        # 分页参数同样生效
+        response = self.client.get(f'/api/tasks/stream?pool_id={other_pool_id}&page=2&per_page=1')
+        tasks = [orjson.loads(line) for line in response.data.splitlines()]
+        self.assertEqual([task['name'] for task in tasks], ['test_task_1'])
+    
+    def test_stream_tasks_nonexistent_pool(self):
+        """测试流式获取不存在线程池的任务"""
+        response = self.client.get('/api/tasks/stream?pool_id=nonexistent')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(self.load_json(response)['success'])
+    
     def test_pagination_metadata(self):
         """测试分页元数据完整性"""
-        response = self.app.get('/api/tasks?page=1&per_page=5')
-        data = json.loads(response.data)
+        response = self.client.get('/api/tasks?page=1&per_page=5')
+        data = self.load_json(response)
         
         pagination = data['pagination']
         required_fields = [
@@ -111,6 +140,3 @@ class TestPaginationAPI(unittest.TestCase):
             expected_items = min(pagination['per_page'], pagination['total_items'])
             actual_items = pagination['end_item'] - pagination['start_item'] + 1
             self.assertEqual(actual_items, expected_items)
-
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
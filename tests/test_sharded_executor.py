@@ -0,0 +1,88 @@
+"""
+分片工作窃取执行器测试
+"""
+
+import pytest
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, Future, wait
+from src.threadpool_manager.sharded_executor import ShardedExecutor, _WorkItem
+
+
+class TestShardedExecutor:
+    """分片工作窃取执行器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.executor = ShardedExecutor(max_workers=2)
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        self.executor.shutdown()
+
+    def test_results(self):
+        """测试任务结果与提交顺序一一对应"""
+        double = lambda x: x * 2
+        futures = [self.executor.submit(double, i) for i in range(1000)]
+        _, not_done = wait(futures, timeout=5, return_when=ALL_COMPLETED)
+        assert not not_done
+        assert [f.result() for f in futures] == [i * 2 for i in range(1000)]
+
+    def test_exception(self):
+        """测试任务异常传递到Future"""
+        future = self.executor.submit(lambda: 1 / 0)
+        assert isinstance(future.exception(timeout=5), ZeroDivisionError)
+
+    def test_work_stealing(self):
+        """测试长任务所在分片的积压任务会被空闲线程窃取"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+            return threading.current_thread().name
+
+        blocker = self.executor.submit(block)
+        assert started.wait(5)
+        current_name = lambda: threading.current_thread().name
+        try:
+            # 轮询分配时一半任务落在被阻塞线程的分片上，只有被窃取才能在阻塞期间完成
+            futures = [self.executor.submit(current_name) for _ in range(20)]
+            _, not_done = wait(futures, timeout=5, return_when=ALL_COMPLETED)
+            assert not not_done
+            assert not blocker.done()
+        finally:
+            release.set()
+        assert blocker.result(timeout=5) not in {f.result() for f in futures}
+
+    def test_steal_half(self):
+        """测试空闲线程从积压最多的分片尾部窃取一半任务"""
+        executor = ShardedExecutor(max_workers=3)
+        items = [_WorkItem(Future(), time.sleep, (0,), {}) for _ in range(5)]
+        executor._queues[1].extend(items[:1])
+        executor._queues[2].extend(items[1:])
+        # 分片2积压4个任务，窃取尾部2个并先执行其中较早提交的一个
+        assert executor._take(0) is items[3]
+        assert list(executor._queues[0]) == items[4:]
+        assert list(executor._queues[2]) == items[1:3]
+        assert list(executor._queues[1]) == items[:1]
+
+    def test_submit_after_shutdown(self):
+        """测试关闭后提交任务"""
+        self.executor.shutdown()
+        with pytest.raises(RuntimeError):
+            self.executor.submit(time.sleep, 0)
+
+    def test_shutdown_cancel_futures(self):
+        """测试关闭时取消未开始的任务"""
+        executor = ShardedExecutor(max_workers=1)
+        futures = [executor.submit(time.sleep, 0.1) for _ in range(5)]
+        executor.shutdown(wait=True, cancel_futures=True)
+        assert all(f.done() for f in futures)
+        assert any(f.cancelled() for f in futures)
+
+    def test_invalid_max_workers(self):
+        """测试非法的工作线程数"""
+        with pytest.raises(ValueError):
+            ShardedExecutor(max_workers=0)